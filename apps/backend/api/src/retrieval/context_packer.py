@@ -83,6 +83,9 @@ class ContextPacker:
                     resp = await client.get(uri)
                     if resp.status_code == 200:
                         crop["base64"] = base64.b64encode(resp.content).decode()
+                        crop["mime_type"] = resp.headers.get(
+                            "content-type", "image/jpeg"
+                        )
                         loaded.append(crop)
         return loaded
 
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import uuid
 from typing import List, Optional
@@ -58,12 +59,17 @@ async def admin_upload(
     doc_id = str(uuid.uuid4())
     gcs_path = f"admin/{doc_id}/{file.filename}"
     
-    # Upload to GCS
+    # Stream the spooled upload to GCS (resumable for large files) off the
+    # event loop, rather than reading it into memory for upload_from_string
     bucket = storage_client.bucket(RAW_PDFS_BUCKET)
     blob = bucket.blob(gcs_path)
     
-    content = await file.read()
-    blob.upload_from_string(content, content_type=CONTENT_TYPES.get(ext, 'application/octet-stream'))
+    await asyncio.to_thread(
+        blob.upload_from_file,
+        file.file,
+        content_type=CONTENT_TYPES.get(ext, 'application/octet-stream'),
+        if_generation_match=0
+    )
     
     # Store metadata
     metadata = {
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import uuid
 from datetime import datetime, timedelta
@@ -50,9 +51,11 @@ async def user_upload(
             detail=f"Unsupported file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}"
         )
     
-    # Check file size (limit to 100MB for user uploads)
-    content = await file.read()
-    if len(content) > 100 * 1024 * 1024:
+    # Check file size (limit to 100MB for user uploads) without reading it
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    if size > 100 * 1024 * 1024:
         raise HTTPException(status_code=400, detail="File too large. Max 100MB for user uploads.")
     
     doc_id = str(uuid.uuid4())
@@ -65,7 +68,13 @@ async def user_upload(
     # Upload to GCS (bucket has 30-day lifecycle policy)
     bucket = storage_client.bucket(USER_UPLOADS_BUCKET)
     blob = bucket.blob(gcs_path)
-    blob.upload_from_string(content, content_type=CONTENT_TYPES.get(ext, 'application/octet-stream'))
+    await asyncio.to_thread(
+        blob.upload_from_file,
+        file.file,
+        size=size,
+        content_type=CONTENT_TYPES.get(ext, 'application/octet-stream'),
+        if_generation_match=0
+    )
     
     metadata = {
         "doc_id": doc_id,
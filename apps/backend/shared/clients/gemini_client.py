@@ -57,7 +57,7 @@ Be precise and factual."""
                 if crop.get("base64"):
                     parts.append({
                         "inline_data": {
-                            "mime_type": "image/png",
+                            "mime_type": crop.get("mime_type", "image/jpeg"),
                             "data": crop["base64"]
                         }
                     })
@@ -96,7 +96,10 @@ Be precise and factual."""
             for crop in image_crops[:5]:
                 if crop.get("base64"):
                     parts.append({
-                        "inline_data": {"mime_type": "image/png", "data": crop["base64"]}
+                        "inline_data": {
+                            "mime_type": crop.get("mime_type", "image/jpeg"),
+                            "data": crop["base64"]
+                        }
                     })
         
         payload = {
@@ -4,8 +4,11 @@ Vespa Client
 Client for Vespa search and document operations.
 """
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncGenerator
 import httpx
+import orjson
+
+JSON_HEADERS = {"content-type": "application/json"}
 
 class VespaClient:
     """Async client for Vespa operations."""
@@ -39,13 +42,15 @@ class VespaClient:
         }
         
         async with httpx.AsyncClient(timeout=timeout) as client:
-            response = await client.post(self.search_url, json=params)
+            response = await client.post(
+                self.search_url, content=self.dumps(params), headers=JSON_HEADERS
+            )
             if response.status_code != 200:
                 import logging
                 logging.getLogger(__name__).error(f"Vespa error {response.status_code}: {response.text}")
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             hits = data.get("root", {}).get("children", [])
             
             return [hit.get("fields", {}) for hit in hits]
@@ -66,10 +71,12 @@ class VespaClient:
         }
         
         async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(self.search_url, json=params)
+            response = await client.post(
+                self.search_url, content=self.dumps(params), headers=JSON_HEADERS
+            )
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             return [hit.get("fields", {}) for hit in data.get("root", {}).get("children", [])]
     
     async def feed_document(
@@ -82,7 +89,9 @@ class VespaClient:
         url = f"{self.document_url}/{schema}/docid/{doc_id}"
         
         async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.post(url, json={"fields": fields})
+            response = await client.post(
+                url, content=self.dumps({"fields": fields}), headers=JSON_HEADERS
+            )
             return response.status_code in (200, 201)
     
     async def get_document(
@@ -96,7 +105,7 @@ class VespaClient:
         async with httpx.AsyncClient(timeout=10) as client:
             response = await client.get(url)
             if response.status_code == 200:
-                return response.json().get("fields")
+                return orjson.loads(response.content).get("fields")
             return None
     
     async def delete_document(
@@ -111,6 +120,66 @@ class VespaClient:
             response = await client.delete(url)
             return response.status_code == 200
     
+    async def visit(
+        self,
+        schema: str,
+        selection: str,
+        field_set: str = None,
+        cluster: str = "sop_content",
+        wanted_document_count: int = 1024,
+        timeout: int = 60
+    ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream documents matching a document selection.
+        
+        Follows continuation tokens page by page so callers never hold
+        more than one page of results in memory.
+        
+        Args:
+            schema: Document type to visit
+            selection: Vespa document selection expression
+            field_set: Fields to return (e.g. "sop_elements:page_number,bbox")
+            cluster: Content cluster to visit
+            wanted_document_count: Documents requested per page
+            timeout: Request timeout in seconds
+            
+        Yields:
+            Field dicts of matching documents
+        """
+        url = f"{self.document_url}/{schema}/docid/"
+        params = {
+            "selection": selection,
+            "cluster": cluster,
+            "wantedDocumentCount": wanted_document_count
+        }
+        if field_set:
+            params["fieldSet"] = field_set
+        
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            while True:
+                response = await client.get(url, params=params)
+                response.raise_for_status()
+                
+                data = orjson.loads(response.content)
+                for document in data.get("documents", []):
+                    yield document.get("fields", {})
+                
+                continuation = data.get("continuation")
+                if not continuation:
+                    break
+                params["continuation"] = continuation
+    
+    @staticmethod
+    def dumps(body: Dict[str, Any]) -> bytes:
+        """Serialize a request body; numpy arrays are encoded natively."""
+        return orjson.dumps(body, option=orjson.OPT_SERIALIZE_NUMPY)
+    
+    @staticmethod
+    def selection_literal(value: str) -> str:
+        """Quote a value for safe use in a document selection expression."""
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+        return f'"{escaped}"'
+    
     async def batch_feed(
         self,
         schema: str,
@@ -126,7 +195,9 @@ class VespaClient:
                 url = f"{self.document_url}/{schema}/docid/{doc_id}"
                 
                 try:
-                    response = await client.post(url, json={"fields": doc})
+                    response = await client.post(
+                        url, content=self.dumps({"fields": doc}), headers=JSON_HEADERS
+                    )
                     if response.status_code in (200, 201):
                         stats["success"] += 1
                     else:
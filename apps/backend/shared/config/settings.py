@@ -15,12 +15,24 @@ class IngestionConfig:
     max_batch_size: int = 20
     min_batch_size: int = 2
     split_concurrency: int = 1  # Reduced for free trial (prevents OOM on 4GB containers)
+    # Extraction processes; 0 = one per CPU core. Default 1 for free trial (OOM)
+    extract_workers: int = int(os.getenv("EXTRACT_WORKERS", "1"))
+    
+    # Admin pipeline stages (split -> extract -> vision)
+    pipeline_queue_size: int = 2  # Batches buffered between stages
+    vision_workers: int = 2  # Batches in vision processing at once
+    
+    # Scratch files (RAM-backed tmpfs when available and large enough)
+    scratch_dir: str = os.getenv("INGEST_SCRATCH_DIR", "/dev/shm")
+    max_scratch_file_mb: int = 1024
     
     # Unstructured - use 'fast' for free trial (hi_res requires heavy CPU/GPU)
     unstructured_strategy: str = "fast"
     unstructured_languages: list = field(default_factory=lambda: ["eng"])
     extract_images: bool = True
     infer_table_structure: bool = True
+    # CSV/Excel chunks with fewer words in their cells skip embedding (BM25 only)
+    tabular_min_embed_words: int = 8
     
     # Retries
     max_retries: int = 3
@@ -29,6 +41,10 @@ class IngestionConfig:
     allow_partial_failure: bool = True
     failure_threshold: float = 0.3  # Max 30% batch failures allowed
     
+    # Scanned pages: local ONNX OCR (batched) instead of per-page Gemini calls
+    local_ocr: bool = os.getenv("LOCAL_OCR", "false").lower() == "true"
+    ocr_batch_size: int = 16
+    
     # QA gates
     min_text_density: float = 0.0001  # Below = likely scanned
     require_bbox_for_visuals: bool = True
@@ -45,6 +61,7 @@ class GeminiConfig:
     # Limits - NEVER upload full PDFs, only page images/crops
     max_image_size_mb: float = 20.0
     max_images_per_request: int = 10
+    crop_jpeg_quality: int = 85
     
     # Generation
     temperature: float = 0.3
@@ -53,6 +70,7 @@ class GeminiConfig:
     # Rate limiting
     requests_per_minute: int = 60
     tokens_per_minute: int = 1000000
+    vision_concurrency: int = 8  # In-flight vision requests per GeminiVision client
 
 @dataclass
 class VespaConfig:
@@ -88,6 +106,11 @@ class CacheConfig:
     embedding_cache_ttl: int = 3600  # 1 hour
     query_cache_ttl: int = 300  # 5 minutes
     max_cache_size_mb: int = 512
+    # Persistent ingest-side embedding cache (worker)
+    embedding_cache_dir: str = os.getenv("EMBEDDING_CACHE_DIR", "~/.cache/generalrag/embeddings")
+    # Per-PDF page info and extraction results, keyed by content hash
+    ingest_cache_dir: str = os.getenv("INGEST_CACHE_DIR", "~/.cache/generalrag/ingest")
+    ingest_cache_size_mb: int = 2048
 
 @dataclass
 class RateLimitConfig:
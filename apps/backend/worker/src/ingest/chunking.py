@@ -8,6 +8,7 @@ Parent context is stored for LLM reading.
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, field
 import re
+import numpy as np
 
 @dataclass
 class Chunk:
@@ -21,6 +22,31 @@ class Chunk:
     bbox: List[float]
     metadata: Dict[str, Any] = field(default_factory=dict)
 
+@dataclass
+class ChunkBatch:
+    """
+    Chunks plus their vectors, stored column-wise.
+    
+    Row i of embeddings/colbert belongs to chunks[i]. Keeping vectors in
+    one contiguous array (rather than in each chunk's metadata, which
+    chunks of the same element share) lets them be attached, quantized
+    and serialized as a block.
+    """
+    chunks: List[Chunk] = field(default_factory=list)
+    embeddings: Optional[np.ndarray] = None  # (N, dim) float32
+    colbert: Optional[List[np.ndarray]] = None  # per chunk (tokens, 128)
+    
+    def __len__(self) -> int:
+        return len(self.chunks)
+    
+    @property
+    def ids(self) -> List[str]:
+        return [c.chunk_id for c in self.chunks]
+    
+    @property
+    def texts(self) -> List[str]:
+        return [c.content_text for c in self.chunks]
+
 class ParentChildChunker:
     """
     Implements parent-child chunking strategy.
@@ -45,7 +71,7 @@ class ParentChildChunker:
         self,
         elements: List[Dict[str, Any]],
         doc_id: str
-    ) -> List[Chunk]:
+    ) -> ChunkBatch:
         """
         Chunk extracted elements with parent context.
         
@@ -54,48 +80,60 @@ class ParentChildChunker:
             doc_id: Document identifier
             
         Returns:
-            List of Chunk objects ready for indexing
+            ChunkBatch of chunks ready for embedding and indexing
         """
         chunks = []
         
         # Build section hierarchy for context
         sections = self._build_section_hierarchy(elements)
         
-        for i, elem in enumerate(elements):
-            elem_type = elem.get("element_type", "text")
-            content = elem.get("content", "")
-            
-            if elem_type == "table":
-                # Tables are kept as single chunks
-                chunks.append(self._create_chunk(
-                    doc_id=doc_id,
-                    element=elem,
-                    content=content,
-                    parent_context=self._get_parent_context(elements, i, sections),
-                    chunk_index=0
-                ))
-            elif elem_type == "figure":
-                # Figures are kept as single chunks
-                chunks.append(self._create_chunk(
-                    doc_id=doc_id,
-                    element=elem,
-                    content=elem.get("figure_caption", content),
-                    parent_context=self._get_parent_context(elements, i, sections),
-                    chunk_index=0
-                ))
-            else:
-                # Text elements are chunked
-                text_chunks = self._split_text(content)
-                for j, text_chunk in enumerate(text_chunks):
-                    chunks.append(self._create_chunk(
-                        doc_id=doc_id,
-                        element=elem,
-                        content=text_chunk,
-                        parent_context=self._get_parent_context(elements, i, sections),
-                        chunk_index=j
-                    ))
+        for i in range(len(elements)):
+            chunks.extend(self._chunk_element(elements, i, sections, doc_id))
         
-        return chunks
+        return ChunkBatch(chunks)
+    
+    def _chunk_element(
+        self,
+        elements: List[Dict[str, Any]],
+        index: int,
+        sections: Dict[int, str],
+        doc_id: str
+    ) -> List[Chunk]:
+        """Chunk the element at index, with context from its neighbours."""
+        elem = elements[index]
+        elem_type = elem.get("element_type", "text")
+        content = elem.get("content", "")
+        
+        if elem_type == "table":
+            # Tables are kept as single chunks
+            return [self._create_chunk(
+                doc_id=doc_id,
+                element=elem,
+                content=content,
+                parent_context=self._get_parent_context(elements, index, sections),
+                chunk_index=0
+            )]
+        elif elem_type == "figure":
+            # Figures are kept as single chunks
+            return [self._create_chunk(
+                doc_id=doc_id,
+                element=elem,
+                content=elem.get("figure_caption", content),
+                parent_context=self._get_parent_context(elements, index, sections),
+                chunk_index=0
+            )]
+        
+        # Text elements are chunked
+        return [
+            self._create_chunk(
+                doc_id=doc_id,
+                element=elem,
+                content=text_chunk,
+                parent_context=self._get_parent_context(elements, index, sections),
+                chunk_index=j
+            )
+            for j, text_chunk in enumerate(self._split_text(content))
+        ]
     
     def _split_text(self, text: str) -> List[str]:
         """Split text into overlapping chunks."""
@@ -215,3 +253,73 @@ class ParentChildChunker:
             bbox=element.get("bbox", [0, 0, 0, 0]),
             metadata=element.get("metadata", {})
         )
+
+
+class StreamingChunker:
+    """
+    Chunks a document's elements incrementally, batch by batch.
+    
+    Produces the same chunks as ParentChildChunker.chunk_elements over the
+    whole document while only holding the elements that can still appear
+    in a parent context window:
+    
+    - an element is chunked once the elements after it overflow its
+      forward context window (or at flush());
+    - already-chunked elements are dropped once they fall out of the
+      backward context window of the next element.
+    """
+    
+    def __init__(self, chunker: ParentChildChunker, doc_id: str):
+        self.chunker = chunker
+        self.doc_id = doc_id
+        self._window: List[Dict[str, Any]] = []
+        self._headers: List[str] = []
+        self._next = 0  # First element in window not yet chunked
+        self._current_header = ""
+    
+    def push(self, elements: List[Dict[str, Any]]) -> ChunkBatch:
+        """Add the next elements in document order; return ready chunks."""
+        for elem in elements:
+            content = elem.get("content", "")
+            if self.chunker._is_header(content, elem):
+                self._current_header = content.strip()
+            self._window.append(elem)
+            self._headers.append(self._current_header)
+        
+        half_window = self.chunker.parent_window_size // 2
+        ready = self._next
+        remaining = sum(len(e.get("content", "")) for e in self._window[ready:])
+        while ready < len(self._window) and remaining > half_window:
+            remaining -= len(self._window[ready].get("content", ""))
+            ready += 1
+        
+        return self._emit(ready)
+    
+    def flush(self) -> ChunkBatch:
+        """Chunk all remaining elements (end of document)."""
+        return self._emit(len(self._window))
+    
+    def _emit(self, end: int) -> ChunkBatch:
+        sections = dict(enumerate(self._headers))
+        chunks = []
+        for i in range(self._next, end):
+            chunks.extend(self.chunker._chunk_element(self._window, i, sections, self.doc_id))
+        self._next = end
+        self._trim()
+        return ChunkBatch(chunks)
+    
+    def _trim(self):
+        """Drop chunked elements no longer reachable as backward context."""
+        half_window = self.chunker.parent_window_size // 2
+        keep_from = self._next
+        total = 0
+        while keep_from > 0:
+            size = len(self._window[keep_from - 1].get("content", ""))
+            if total + size > half_window:
+                break
+            total += size
+            keep_from -= 1
+        
+        del self._window[:keep_from]
+        del self._headers[:keep_from]
+        self._next -= keep_from
@@ -0,0 +1,79 @@
+"""
+Embedding Cache
+
+Persistent content-hash cache for chunk embeddings so re-ingested
+documents and repeated boilerplate skip the embedding API.
+"""
+import os
+import hashlib
+from typing import Dict, List, Optional
+import numpy as np
+import diskcache
+
+from shared.config.settings import get_config
+
+config = get_config()
+
+
+class EmbeddingCache:
+    """
+    Disk-backed map of hash(model, text) -> embedding vector.
+    
+    Entries are evicted oldest-stored first (FIFO) once the size limit is
+    reached. Namespaces keep dense and token-level (ColBERT) vectors apart.
+    """
+    
+    def __init__(
+        self,
+        directory: str = None,
+        size_limit_mb: int = None,
+        model: str = None
+    ):
+        directory = os.path.expanduser(directory or config.cache.embedding_cache_dir)
+        size_limit_mb = size_limit_mb or config.cache.max_cache_size_mb
+        self.model = model or config.gemini.embedding_model
+        self._cache = diskcache.Cache(
+            directory,
+            size_limit=size_limit_mb * 1024 * 1024,
+            eviction_policy="least-recently-stored"
+        )
+    
+    def _make_key(self, text: str, namespace: str) -> str:
+        digest = hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+        return f"{namespace}:{self.model}:{digest}"
+    
+    def get_many(
+        self,
+        texts: List[str],
+        namespace: str = "dense"
+    ) -> Dict[int, np.ndarray]:
+        """Return cached vectors keyed by index into texts."""
+        found = {}
+        for i, text in enumerate(texts):
+            raw = self._cache.get(self._make_key(text, namespace))
+            if raw is not None:
+                found[i] = np.frombuffer(raw, dtype=np.float32)
+        return found
+    
+    def set_many(
+        self,
+        texts: List[str],
+        vectors: np.ndarray,
+        namespace: str = "dense"
+    ):
+        """Store vectors for texts (row i belongs to texts[i])."""
+        for text, vector in zip(texts, vectors):
+            self._cache.set(
+                self._make_key(text, namespace),
+                np.asarray(vector, dtype=np.float32).tobytes()
+            )
+
+
+# Global cache instance, opened on first use
+_embedding_cache: Optional[EmbeddingCache] = None
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache()
+    return _embedding_cache
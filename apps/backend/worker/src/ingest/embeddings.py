@@ -5,9 +5,10 @@ Generates dense embeddings using Gemini text-embedding-004 (768 dimensions).
 Consistent with Vespa schema and API query embeddings.
 """
 import asyncio
-from typing import List, Tuple
+from typing import Dict, List, Tuple, Optional
 import numpy as np
 
+from src.ingest.embedding_cache import EmbeddingCache
 from shared.clients.gemini_client import GeminiClient
 
 
@@ -21,8 +22,9 @@ class EmbeddingGenerator:
     
     EMBEDDING_DIM = 768  # text-embedding-004 output dimension
     
-    def __init__(self):
+    def __init__(self, cache: Optional[EmbeddingCache] = None):
         self.client = GeminiClient()
+        self.cache = cache
     
     def embed(self, text: str) -> List[float]:
         """Generate embedding for single text (sync wrapper)."""
@@ -59,15 +61,54 @@ class EmbeddingGenerator:
         Returns:
             - dense_embeddings: (N, 768) array
             - colbert_embeddings: Empty list (not supported)
+        
+        Duplicate texts (repeated headers, footers, boilerplate) are
+        embedded once and scattered back to every position. When a cache
+        is configured, only texts without a cached vector are sent to the
+        API; results are reassembled in input order.
         """
+        # Unique texts in first-seen order, plus each input's index into them
+        index: Dict[str, int] = {}
+        inverse = np.fromiter(
+            (index.setdefault(text, len(index)) for text in texts),
+            dtype=np.intp,
+            count=len(texts)
+        )
+        unique_texts = list(index)
+        
+        embeddings = self._embed_unique(unique_texts, batch_size)
+        if len(unique_texts) == len(texts):
+            return embeddings, []
+        return embeddings[inverse], []
+    
+    def _embed_unique(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Embed distinct texts, using the cache when configured."""
+        cached = self.cache.get_many(texts) if self.cache else {}
+        missing = [i for i in range(len(texts)) if i not in cached]
+        missing_texts = [texts[i] for i in missing]
+        
         all_embeddings = []
         
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+        for i in range(0, len(missing_texts), batch_size):
+            batch = missing_texts[i:i + batch_size]
             embeddings = asyncio.run(self.client.batch_embed(batch))
             all_embeddings.extend(embeddings)
         
-        return np.array(all_embeddings, dtype=np.float32), []
+        if not cached:
+            fresh = np.array(all_embeddings, dtype=np.float32)
+            if self.cache and missing_texts:
+                self.cache.set_many(missing_texts, fresh)
+            return fresh
+        
+        result = np.empty((len(texts), self.EMBEDDING_DIM), dtype=np.float32)
+        for i, vector in cached.items():
+            result[i] = vector
+        if missing:
+            fresh = np.array(all_embeddings, dtype=np.float32)
+            self.cache.set_many(missing_texts, fresh)
+            result[missing] = fresh
+        
+        return result
     
     async def batch_embed_async(
         self,
@@ -0,0 +1,83 @@
+"""
+Async GCS I/O
+
+Streams objects between GCS and local scratch files without blocking the
+event loop (google-cloud-storage calls are synchronous).
+"""
+import hashlib
+import os
+import tempfile
+from typing import Tuple
+
+import aiofiles
+from gcloud.aio.storage import Storage
+
+from src.ingest.scratch import get_scratch_dir
+
+DOWNLOAD_CHUNK_SIZE = 512 * 1024  # 512KB reads, matches GCS connector tuning
+
+
+def parse_gcs_uri(gcs_uri: str) -> Tuple[str, str]:
+    """Split gs://bucket/path into (bucket, path)."""
+    bucket_name = gcs_uri.split("/")[2]
+    blob_path = "/".join(gcs_uri.split("/")[3:])
+    return bucket_name, blob_path
+
+
+async def download_to_tempfile(
+    storage: Storage,
+    gcs_uri: str,
+    suffix: str = "",
+    chunk_size: int = DOWNLOAD_CHUNK_SIZE
+) -> Tuple[str, str]:
+    """
+    Stream a GCS object into a new temp file.
+    
+    Chunks are written as they arrive, so large PDFs never sit fully in
+    memory and other coroutines keep running during the download. The
+    file goes to tmpfs scratch space when it fits. The content is hashed
+    on the way through, for caches keyed by file content.
+    
+    Returns:
+        Tuple of (temp file path (caller removes it), sha256 hex digest)
+    """
+    bucket_name, blob_path = parse_gcs_uri(gcs_uri)
+    
+    stream = await storage.download_stream(bucket_name, blob_path)
+    path = None
+    try:
+        scratch_dir = get_scratch_dir(stream.content_length or 0)
+        with tempfile.NamedTemporaryFile(suffix=suffix, dir=scratch_dir, delete=False) as f:
+            path = f.name
+        
+        digest = hashlib.sha256()
+        async with aiofiles.open(path, "wb") as out:
+            while True:
+                chunk = await stream.read(chunk_size)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        # Don't leave a partial download behind (tmpfs holds it in RAM)
+        if path is not None:
+            _remove_quietly(path)
+        raise
+    finally:
+        _release(stream)
+    
+    return path, digest.hexdigest()
+
+
+def _release(stream):
+    """Return the stream's HTTP connection to the session's pool."""
+    # StreamResponse wraps the aiohttp response without exposing release()
+    response = getattr(stream, "_response", stream)
+    response.release()
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
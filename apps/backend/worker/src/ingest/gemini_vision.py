@@ -11,6 +11,7 @@ CRITICAL: Never upload full PDFs to Gemini. Always:
 
 Gemini PDF limits: 50MB / 1000 pages - our corpus is 1-2GB per file.
 """
+import asyncio
 import os
 import io
 import base64
@@ -20,6 +21,7 @@ import httpx
 from PIL import Image
 import fitz
 
+from src.ingest.http_client import create_http_client
 from shared.config.settings import get_config
 
 config = get_config()
@@ -38,17 +40,22 @@ class GeminiVision:
     IMPORTANT: This class ONLY accepts image bytes, never PDFs.
     The ingestion pipeline must:
     1. split_pdf() -> page batches
-    2. render_page() -> PNG bytes
-    3. crop_region() -> PNG bytes for tables/figures
+    2. render_page() -> JPEG bytes
+    3. crop_region() -> JPEG bytes for tables/figures
     4. Call this class with image bytes only
     """
     
     GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+    IMAGE_MIME_TYPE = "image/jpeg"
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, http_client: httpx.AsyncClient = None):
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        # Pooled keep-alive (HTTP/2) connections, usually shared with the pipeline
+        self._http = http_client or create_http_client()
         self.model = config.gemini.vision_model
         self.max_image_size = config.gemini.max_image_size_mb * 1024 * 1024
+        # Bounds concurrent requests when callers gather many crops at once
+        self._semaphore = asyncio.Semaphore(config.gemini.vision_concurrency)
     
     async def process_table(
         self, 
@@ -126,7 +133,7 @@ Provide a comprehensive description that would allow someone to understand the f
         OCR scanned page using Gemini.
         
         Args:
-            image_bytes: PNG bytes of rendered page (NOT PDF)
+            image_bytes: JPEG bytes of rendered page (NOT PDF)
             element_id: Element identifier
         """
         self._validate_image_size(image_bytes)
@@ -169,7 +176,7 @@ Output the extracted text with proper formatting."""
                     {"text": prompt},
                     {
                         "inline_data": {
-                            "mime_type": "image/png",
+                            "mime_type": self.IMAGE_MIME_TYPE,
                             "data": image_b64
                         }
                     }
@@ -183,8 +190,8 @@ Output the extracted text with proper formatting."""
         
         url = f"{self.GEMINI_API_URL}/{self.model}:generateContent?key={self.api_key}"
         
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.post(url, json=payload)
+        async with self._semaphore:
+            response = await self._http.post(url, json=payload, timeout=60)
             response.raise_for_status()
             
             data = response.json()
@@ -198,38 +205,48 @@ Output the extracted text with proper formatting."""
         dpi: int = 150
     ) -> bytes:
         """
-        Crop a region from PDF page and return as PNG bytes.
+        Crop a region from PDF page and return as JPEG bytes.
         
         This renders the page first, then crops - never sends PDF to Gemini.
         """
         doc = fitz.open(pdf_path)
-        page = doc[page_number]
-        
-        rect = fitz.Rect(bbox)
-        mat = fitz.Matrix(dpi / 72, dpi / 72)
-        
-        pix = page.get_pixmap(matrix=mat, clip=rect)
-        img_bytes = pix.tobytes("png")
-        
-        doc.close()
-        
-        self._validate_image_size(img_bytes)
-        return img_bytes
+        try:
+            return self.crop_page(doc[page_number], bbox, dpi)
+        finally:
+            doc.close()
     
     def render_page(self, pdf_path: str, page_number: int, dpi: int = 150) -> bytes:
         """
-        Render full page as PNG bytes.
+        Render full page as JPEG bytes.
         
         Use this for scanned page OCR - sends image to Gemini, not PDF.
         """
         doc = fitz.open(pdf_path)
-        page = doc[page_number]
-        
+        try:
+            return self.render_loaded_page(doc[page_number], dpi)
+        finally:
+            doc.close()
+    
+    def crop_page(self, page: fitz.Page, bbox: List[float], dpi: int = 150) -> bytes:
+        """Crop a region from an already loaded page (JPEG bytes)."""
+        mat = fitz.Matrix(dpi / 72, dpi / 72)
+        pix = page.get_pixmap(matrix=mat, clip=fitz.Rect(bbox))
+        return self._encode(pix)
+    
+    def render_loaded_page(self, page: fitz.Page, dpi: int = 150) -> bytes:
+        """Render an already loaded page (JPEG bytes)."""
         mat = fitz.Matrix(dpi / 72, dpi / 72)
         pix = page.get_pixmap(matrix=mat)
-        img_bytes = pix.tobytes("png")
+        return self._encode(pix)
+    
+    def _encode(self, pix: fitz.Pixmap) -> bytes:
+        """
+        Encode a rendered pixmap as JPEG.
         
-        doc.close()
+        JPEG is several times smaller and faster to encode than PNG for
+        page renders, which cuts both encode CPU and upload payload.
+        """
+        img_bytes = pix.tobytes("jpg", jpg_quality=config.gemini.crop_jpeg_quality)
         
         self._validate_image_size(img_bytes)
         return img_bytes
@@ -0,0 +1,27 @@
+"""
+HTTP Client
+
+Shared pooled httpx client for Gemini vision and Vespa feed calls.
+One client per pipeline keeps TLS connections alive across calls, and
+HTTP/2 multiplexes the gathered vision requests over them.
+"""
+import httpx
+
+MAX_CONNECTIONS = 64
+MAX_KEEPALIVE_CONNECTIONS = 32
+
+
+def create_http_client(timeout: float = 60) -> httpx.AsyncClient:
+    """
+    Create a pooled HTTP/2 client.
+    
+    The owner is responsible for calling aclose() on shutdown.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS
+        )
+    )
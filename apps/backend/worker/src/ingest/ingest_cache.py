@@ -0,0 +1,33 @@
+"""
+Ingest Cache
+
+Disk cache of per-PDF intermediates (page info, extracted elements) keyed
+by the PDF's sha256, so re-ingesting an unchanged document skips straight
+to the embed and feed stages.
+"""
+import os
+from typing import Optional
+import diskcache
+
+from shared.config.settings import get_config
+
+config = get_config()
+
+
+def make_key(kind: str, pdf_sha256: str, *parts) -> str:
+    """Build a cache key; parts carry whatever else the value depends on."""
+    return ":".join([kind, pdf_sha256, *map(str, parts)])
+
+
+# Global cache instance, opened on first use
+_ingest_cache: Optional[diskcache.Cache] = None
+
+def get_ingest_cache() -> diskcache.Cache:
+    global _ingest_cache
+    if _ingest_cache is None:
+        _ingest_cache = diskcache.Cache(
+            os.path.expanduser(config.cache.ingest_cache_dir),
+            size_limit=config.cache.ingest_cache_size_mb * 1024 * 1024,
+            eviction_policy="least-recently-used"
+        )
+    return _ingest_cache
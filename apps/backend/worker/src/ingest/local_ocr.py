@@ -0,0 +1,45 @@
+"""
+Local OCR Module
+
+Batched OCR for scanned pages using docTR models on ONNX Runtime
+(onnxtr). Runs on GPU via CUDAExecutionProvider when onnxruntime-gpu is
+installed, otherwise on CPU.
+
+Replaces one Gemini round-trip per scanned page with a local forward
+pass over many pages at once; Gemini remains the fallback.
+"""
+from typing import List
+
+from shared.config.settings import get_config
+
+config = get_config()
+
+
+class LocalOCR:
+    """Batched page OCR with a locally loaded ONNX model."""
+    
+    def __init__(self, batch_size: int = None):
+        # Imported here so the worker starts without onnxtr installed
+        from onnxtr.models import ocr_predictor
+        
+        self.batch_size = batch_size or config.ingestion.ocr_batch_size
+        self._predictor = ocr_predictor(det_bs=self.batch_size)
+    
+    def recognize(self, page_images: List[bytes]) -> List[str]:
+        """
+        OCR rendered page images.
+        
+        Args:
+            page_images: PNG/JPEG bytes, one per page
+            
+        Returns:
+            Extracted text per page, in input order
+        """
+        from onnxtr.io import DocumentFile
+        
+        pages = DocumentFile.from_images(page_images)
+        texts = []
+        for i in range(0, len(pages), self.batch_size):
+            result = self._predictor(pages[i:i + self.batch_size])
+            texts.extend(page.render() for page in result.pages)
+        return texts
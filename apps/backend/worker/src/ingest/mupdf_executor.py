@@ -0,0 +1,33 @@
+"""
+MuPDF Executor
+
+PyMuPDF is not thread-safe: MuPDF keeps global state, and documents and
+pages must not be used from more than one thread at a time. In-process
+MuPDF work (opening, splitting, page info, crops, renders) runs on one
+dedicated thread, which keeps it off the event loop without any two calls
+ever overlapping. The extraction process pool uses separate processes
+and is unaffected.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+# Shared by all pipelines in the process; created on first use
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_mupdf_executor() -> ThreadPoolExecutor:
+    """Get the single-thread executor that owns all MuPDF calls."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mupdf")
+    return _executor
+
+
+async def run_mupdf(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking MuPDF call on the MuPDF thread and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_mupdf_executor(), functools.partial(func, *args, **kwargs)
+    )
@@ -4,11 +4,15 @@ Reconciliation Pass
 Backstop to catch missed tables/figures after initial ingestion.
 Re-scans pages looking for visual elements that weren't extracted.
 """
+import hashlib
 import fitz
-from typing import List, Dict
+import numpy as np
+from collections import defaultdict
+from typing import List, Dict, Tuple
 from dataclasses import dataclass
 
 from src.ingest.gemini_vision import GeminiVision
+from src.ingest.mupdf_executor import run_mupdf
 from shared.clients.vespa_client import VespaClient
 from shared.config.settings import get_config
 
@@ -16,7 +20,7 @@ config = get_config()
 
 @dataclass
 class MissedElement:
-    page_number: int
+    page_number: int  # 1-based, as stored in Vespa
     bbox: List[float]
     element_type: str  # table, figure
 
@@ -28,6 +32,10 @@ class ReconciliationPass:
         self.vespa = vespa
         self.vision = vision
         self.min_image_area = 10000  # px^2 - ignore tiny images
+        self.min_table_rects = 5  # rects per cluster to count as a table
+        self.max_rect_page_fraction = 0.5  # larger rects are page borders/frames
+        self.grid_cell_size = 50  # pt - rects sharing a cell are clustered
+        self.iou_threshold = 0.5  # overlap that counts as already indexed
     
     async def run(self, doc_id: str, pdf_path: str, tenant_id: str) -> Dict:
         """
@@ -36,16 +44,18 @@ class ReconciliationPass:
         Returns stats on found/processed elements.
         """
         # Get already-indexed elements
-        indexed = await self._get_indexed_elements(doc_id, tenant_id)
-        indexed_pages = {(e["page_number"], tuple(e["bbox"])) for e in indexed}
+        indexed_regions = await self._get_indexed_regions(doc_id, tenant_id)
         
         # Scan PDF for visual regions
-        candidates = self._find_visual_regions(pdf_path)
+        candidates = await run_mupdf(self._find_visual_regions, pdf_path)
         
         # Find missed elements
         missed = [
             c for c in candidates
-            if (c.page_number, tuple(c.bbox)) not in indexed_pages
+            if not any(
+                self._iou(c.bbox, bbox) > self.iou_threshold
+                for bbox in indexed_regions.get(c.page_number, ())
+            )
         ]
         
         if not missed:
@@ -55,7 +65,9 @@ class ReconciliationPass:
         processed = 0
         for elem in missed:
             try:
-                crop = self.vision.crop_region(pdf_path, elem.page_number, elem.bbox)
+                crop = await run_mupdf(
+                    self.vision.crop_region, pdf_path, elem.page_number - 1, elem.bbox
+                )
                 
                 if elem.element_type == "table":
                     result = await self.vision.process_table(crop, f"recon_{elem.page_number}")
@@ -73,21 +85,37 @@ class ReconciliationPass:
         
         return {"missed": len(missed), "processed": processed}
     
-    async def _get_indexed_elements(self, doc_id: str, tenant_id: str) -> List[Dict]:
-        """Get all indexed elements for doc."""
-        yql = f"""
-            select element_id, page_number, bbox, element_type 
-            from sop_elements 
-            where doc_id = '{doc_id}' and tenant_id = '{tenant_id}'
-        """
-        return await self.vespa.query(yql, {})
+    async def _get_indexed_regions(
+        self,
+        doc_id: str,
+        tenant_id: str
+    ) -> Dict[int, List[Tuple[float, ...]]]:
+        """Get bboxes of all indexed elements for doc, keyed by page number."""
+        literal = self.vespa.selection_literal
+        selection = (
+            f"sop_elements.doc_id == {literal(doc_id)} "
+            f"and sop_elements.tenant_id == {literal(tenant_id)}"
+        )
+        
+        # Visit page by page so large docs never materialise the full result set
+        indexed_regions = defaultdict(list)
+        async for fields in self.vespa.visit(
+            "sop_elements",
+            selection,
+            field_set="sop_elements:page_number,bbox"
+        ):
+            bbox = fields.get("bbox")
+            if bbox:
+                indexed_regions[fields.get("page_number")].append(tuple(bbox))
+        return indexed_regions
     
     def _find_visual_regions(self, pdf_path: str) -> List[MissedElement]:
         """Detect tables/figures via PyMuPDF heuristics."""
         doc = fitz.open(pdf_path)
         candidates = []
         
-        for page_num, page in enumerate(doc):
+        # 1-based page numbers, matching the indexed elements in Vespa
+        for page_num, page in enumerate(doc, start=1):
             # Find images
             for img in page.get_images():
                 xref = img[0]
@@ -102,25 +130,85 @@ class ReconciliationPass:
                             element_type="figure"
                         ))
             
-            # Find table-like regions (rectangles with lines)
-            drawings = page.get_drawings()
-            rects = [d for d in drawings if d["type"] == "re"]
-            if len(rects) > 5:  # Multiple rectangles = likely table
-                # Get bounding box of all rects
-                all_points = []
-                for r in rects:
-                    all_points.extend(r["rect"])
-                if all_points:
+            # Find table-like regions (clusters of rectangles with lines).
+            # Rects covering most of the page are borders, which would
+            # join every cluster on the page into one
+            max_area = self.max_rect_page_fraction * page.rect.width * page.rect.height
+            rects = [
+                item[1]
+                for d in page.get_drawings()
+                for item in d["items"]
+                if item[0] == "re" and item[1].width * item[1].height <= max_area
+            ]
+            if len(rects) > self.min_table_rects:
+                for bbox in self._cluster_rects(rects):
                     candidates.append(MissedElement(
                         page_number=page_num,
-                        bbox=[min(all_points[::2]), min(all_points[1::2]),
-                              max(all_points[::2]), max(all_points[1::2])],
+                        bbox=bbox,
                         element_type="table"
                     ))
         
         doc.close()
         return candidates
     
+    def _cluster_rects(self, rects: List[fitz.Rect]) -> List[List[float]]:
+        """
+        Group rectangles that share grid cells into clusters.
+        
+        Each cluster with more than min_table_rects members yields one bbox,
+        so separate tables on a page become separate candidates instead of
+        one region spanning the whole page.
+        """
+        rects_np = np.array([tuple(r) for r in rects], dtype=np.float32)
+        cell_idx = np.floor_divide(rects_np, self.grid_cell_size).astype(np.int32)
+        parent = list(range(len(rects)))
+        
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        
+        # Union every rect with the first rect seen in each cell it covers
+        cells = {}
+        for i, (cx0, cy0, cx1, cy1) in enumerate(cell_idx):
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    owner = cells.setdefault((cx, cy), i)
+                    if owner != i:
+                        parent[find(i)] = find(owner)
+        
+        roots = np.array([find(i) for i in range(len(rects))])
+        bboxes = []
+        for root in np.unique(roots):
+            mask = roots == root
+            if mask.sum() <= self.min_table_rects:
+                continue
+            mn = rects_np[mask, :2].min(axis=0)
+            mx = rects_np[mask, 2:].max(axis=0)
+            bboxes.append([float(mn[0]), float(mn[1]), float(mx[0]), float(mx[1])])
+        return bboxes
+    
+    @staticmethod
+    def _iou(a, b) -> float:
+        """Intersection over union of two [x0, y0, x1, y1] boxes."""
+        ix = min(a[2], b[2]) - max(a[0], b[0])
+        iy = min(a[3], b[3]) - max(a[1], b[1])
+        if ix <= 0 or iy <= 0:
+            return 0.0
+        inter = ix * iy
+        union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+        return inter / union if union > 0 else 0.0
+    
+    @staticmethod
+    def _element_id(doc_id: str, elem: MissedElement) -> str:
+        """Stable id per region, so regions sharing a page don't overwrite each other."""
+        region = hashlib.blake2b(
+            ",".join(f"{v:.1f}" for v in elem.bbox).encode(),
+            digest_size=4
+        ).hexdigest()
+        return f"recon_{doc_id}_{elem.page_number}_{elem.element_type}_{region}"
+    
     async def _index_element(self, doc_id: str, elem: MissedElement, result, tenant_id: str):
         """Index reconciled element to Vespa."""
         from src.ingest.embeddings import EmbeddingGenerator
@@ -130,7 +218,7 @@ class ReconciliationPass:
         
         doc = {
             "doc_id": doc_id,
-            "element_id": f"recon_{doc_id}_{elem.page_number}_{elem.element_type}",
+            "element_id": self._element_id(doc_id, elem),
             "tenant_id": tenant_id,
             "workspace_id": config.default_workspace_id,
             "access_scope": "global",
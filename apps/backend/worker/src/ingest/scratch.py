@@ -0,0 +1,66 @@
+"""
+Scratch Space
+
+Picks where ingestion temp files (downloaded PDFs, batch PDFs) live.
+PDFs are re-read several times (page info, batching, crops, renders), so
+a RAM-backed tmpfs serves those reads from memory instead of disk.
+"""
+import asyncio
+import os
+import shutil
+from typing import Optional, Set
+
+from shared.config.settings import get_config
+
+config = get_config()
+
+# In-flight background removals. The event loop only keeps weak references
+# to tasks, so hold them here until they finish.
+_pending_removals: Set[asyncio.Task] = set()
+
+
+def get_scratch_dir(size_bytes: int = 0) -> Optional[str]:
+    """
+    Return the tmpfs scratch dir if it can hold size_bytes, else None.
+    
+    None means "use the system temp dir", so the result can be passed
+    straight to tempfile's dir= argument.
+    """
+    scratch_dir = config.ingestion.scratch_dir
+    if not scratch_dir or not os.path.isdir(scratch_dir) or not os.access(scratch_dir, os.W_OK):
+        return None
+    
+    if size_bytes > config.ingestion.max_scratch_file_mb * 1024 * 1024:
+        return None
+    
+    # Leave headroom: batch files for the same PDF land here too
+    if shutil.disk_usage(scratch_dir).free < size_bytes * 2:
+        return None
+    
+    return scratch_dir
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def remove_later(path: str) -> asyncio.Task:
+    """
+    Delete a scratch file in a worker thread without waiting for it.
+    
+    Unlinking can stall on slow or network disks; the caller moves on
+    and drain_removals() waits for stragglers at shutdown.
+    """
+    task = asyncio.create_task(asyncio.to_thread(_remove_file, path))
+    _pending_removals.add(task)
+    task.add_done_callback(_pending_removals.discard)
+    return task
+
+
+async def drain_removals():
+    """Wait for pending background removals to finish."""
+    if _pending_removals:
+        await asyncio.gather(*_pending_removals, return_exceptions=True)
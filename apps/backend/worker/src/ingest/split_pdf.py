@@ -11,10 +11,12 @@ CRITICAL: This is required because:
 """
 import os
 import tempfile
-from typing import List, Tuple, Generator
+from contextlib import contextmanager
+from typing import List, Tuple, Generator, Optional
 from dataclasses import dataclass
 import fitz  # PyMuPDF
 
+from src.ingest.scratch import get_scratch_dir
 from shared.config.settings import get_config
 
 config = get_config()
@@ -32,19 +34,66 @@ class PDFSplitter:
     Splits large PDFs into batches for parallel processing.
     
     Config-driven batch size and concurrency from settings.py
+    
+    Open the source PDF once and reuse the parsed document across calls:
+    
+        with PDFSplitter().open(pdf_path) as splitter:
+            info = splitter.get_page_info()
+            for batch in splitter.iter_batches():
+                ...
+    
+    Methods still accept an explicit pdf_path, which is opened for that
+    call only when it differs from the open document.
     """
     
     def __init__(self):
         self.batch_size = config.ingestion.batch_size
         self.max_batch_size = config.ingestion.max_batch_size
         self.min_batch_size = config.ingestion.min_batch_size
+        self._doc: Optional[fitz.Document] = None
+        self._pdf_path: Optional[str] = None
+    
+    def open(self, pdf_path: str) -> "PDFSplitter":
+        """Open and parse pdf_path once for subsequent calls."""
+        self.close()
+        self._doc = fitz.open(pdf_path)
+        self._pdf_path = pdf_path
+        return self
+    
+    def close(self):
+        """Close the open document, if any."""
+        if self._doc is not None:
+            self._doc.close()
+        self._doc = None
+        self._pdf_path = None
+    
+    def __enter__(self) -> "PDFSplitter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
     
-    def split(self, pdf_path: str, output_dir: str = None) -> List[PDFBatch]:
+    @contextmanager
+    def _document(self, pdf_path: str = None) -> Generator[Tuple[fitz.Document, str], None, None]:
+        """Yield (doc, path), reusing the open document when possible."""
+        if self._doc is not None and pdf_path in (None, self._pdf_path):
+            yield self._doc, self._pdf_path
+            return
+        if pdf_path is None:
+            raise ValueError("No PDF open: pass pdf_path or call open() first")
+        
+        doc = fitz.open(pdf_path)
+        try:
+            yield doc, pdf_path
+        finally:
+            doc.close()
+    
+    def split(self, pdf_path: str = None, output_dir: str = None) -> List[PDFBatch]:
         """
         Split PDF into batches.
         
         Args:
-            pdf_path: Path to source PDF
+            pdf_path: Path to source PDF (defaults to the open document)
             output_dir: Directory for batch files (uses temp if None)
             
         Returns:
@@ -52,7 +101,11 @@ class PDFSplitter:
         """
         output_dir = output_dir or tempfile.mkdtemp(prefix="pdf_batches_")
         
-        doc = fitz.open(pdf_path)
+        with self._document(pdf_path) as (doc, _):
+            return self._split_doc(doc, output_dir)
+    
+    def _split_doc(self, doc: fitz.Document, output_dir: str) -> List[PDFBatch]:
+        """Write every batch of doc into output_dir."""
         total_pages = len(doc)
         batches = []
         
@@ -66,12 +119,8 @@ class PDFSplitter:
             end_page = min(start_page + batch_size, total_pages)
             
             # Create batch PDF
-            batch_doc = fitz.open()
-            batch_doc.insert_pdf(doc, from_page=start_page, to_page=end_page - 1)
-            
             batch_path = os.path.join(output_dir, f"batch_{batch_id:04d}.pdf")
-            batch_doc.save(batch_path)
-            batch_doc.close()
+            self._write_batch(doc, start_page, end_page, batch_path)
             
             batches.append(PDFBatch(
                 batch_id=batch_id,
@@ -81,12 +130,19 @@ class PDFSplitter:
                 page_count=end_page - start_page
             ))
         
-        doc.close()
         return batches
     
-    def iter_batches(self, pdf_path: str) -> Generator[PDFBatch, None, None]:
+    def iter_batches(self, pdf_path: str = None) -> Generator[PDFBatch, None, None]:
         """Iterate over batches without storing all in memory."""
-        doc = fitz.open(pdf_path)
+        with self._document(pdf_path) as (doc, path):
+            yield from self._iter_doc_batches(doc, os.path.getsize(path))
+    
+    def _iter_doc_batches(
+        self,
+        doc: fitz.Document,
+        file_size: int
+    ) -> Generator[PDFBatch, None, None]:
+        """Yield batches of doc (file_size bytes on disk) written to temp files."""
         total_pages = len(doc)
         
         batch_size = min(
@@ -97,32 +153,51 @@ class PDFSplitter:
         for batch_id, start_page in enumerate(range(0, total_pages, batch_size)):
             end_page = min(start_page + batch_size, total_pages)
             
-            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
-                batch_doc = fitz.open()
-                batch_doc.insert_pdf(doc, from_page=start_page, to_page=end_page - 1)
-                batch_doc.save(f.name)
-                batch_doc.close()
-                
-                yield PDFBatch(
-                    batch_id=batch_id,
-                    start_page=start_page,
-                    end_page=end_page,
-                    temp_path=f.name,
-                    page_count=end_page - start_page
-                )
-        
-        doc.close()
+            # Estimate the batch's size from its share of the pages, so
+            # tmpfs is only used when it has room for it
+            estimated_size = file_size * (end_page - start_page) // max(1, total_pages)
+            scratch_dir = get_scratch_dir(estimated_size)
+            with tempfile.NamedTemporaryFile(suffix=".pdf", dir=scratch_dir, delete=False) as f:
+                batch_path = f.name
+            try:
+                self._write_batch(doc, start_page, end_page, batch_path)
+            except BaseException:
+                os.remove(batch_path)
+                raise
+            
+            yield PDFBatch(
+                batch_id=batch_id,
+                start_page=start_page,
+                end_page=end_page,
+                temp_path=batch_path,
+                page_count=end_page - start_page
+            )
     
-    def get_page_info(self, pdf_path: str) -> dict:
+    def _write_batch(
+        self,
+        doc: fitz.Document,
+        start_page: int,
+        end_page: int,
+        batch_path: str
+    ):
+        """Write pages [start_page, end_page) of doc to batch_path."""
+        batch_doc = fitz.open()
+        # Extraction never follows links, so skip copying and re-targeting
+        # them (annotations are kept; they can carry visible content)
+        batch_doc.insert_pdf(
+            doc, from_page=start_page, to_page=end_page - 1, links=False
+        )
+        batch_doc.save(batch_path)
+        batch_doc.close()
+    
+    def get_page_info(self, pdf_path: str = None) -> dict:
         """Get PDF metadata and page count."""
-        doc = fitz.open(pdf_path)
-        info = {
-            "total_pages": len(doc),
-            "metadata": doc.metadata,
-            "file_size_mb": os.path.getsize(pdf_path) / (1024 * 1024)
-        }
-        doc.close()
-        return info
+        with self._document(pdf_path) as (doc, path):
+            return {
+                "total_pages": len(doc),
+                "metadata": doc.metadata,
+                "file_size_mb": os.path.getsize(path) / (1024 * 1024)
+            }
     
     def cleanup_batches(self, batches: List[PDFBatch]):
         """Remove temporary batch files."""
@@ -4,16 +4,23 @@ Tabular Data Extractor
 Extracts and chunks CSV/Excel files for RAG indexing.
 No vision processing needed - direct structure preservation.
 """
+import io
 import os
+import re
 import hashlib
-from typing import List, Dict, Any, Generator
+from itertools import islice
+from typing import List, Dict, Any, Generator, Iterable
 from dataclasses import dataclass
+import openpyxl
 import pandas as pd
 
 from shared.config.settings import get_config
 
 config = get_config()
 
+# A run of 3+ letters; digits, dates and codes like "A1" don't count
+WORD_RE = re.compile(r"[^\W\d_]{3,}")
+
 @dataclass
 class TabularChunk:
     chunk_id: str
@@ -23,16 +30,23 @@ class TabularChunk:
     row_end: int
     columns: List[str]
     metadata: Dict[str, Any]
+    text_like: bool = True  # False when cell values are mostly numeric
 
 
 class TabularExtractor:
     """Extract and chunk CSV/Excel files."""
     
-    def __init__(self, rows_per_chunk: int = 50):
+    def __init__(self, rows_per_chunk: int = 50, chunks_per_read: int = 20):
         self.rows_per_chunk = rows_per_chunk
+        # Rows read per batch; a multiple of rows_per_chunk so chunks align
+        self.rows_per_read = rows_per_chunk * chunks_per_read
     
-    def extract(self, file_path: str, doc_id: str) -> List[TabularChunk]:
-        """Extract chunks from CSV or Excel file."""
+    def extract(self, file_path: str, doc_id: str) -> Generator[TabularChunk, None, None]:
+        """
+        Stream chunks from CSV or Excel file.
+        
+        Only one read batch of rows is held in memory at a time.
+        """
         ext = os.path.splitext(file_path)[1].lower()
         
         if ext == '.csv':
@@ -42,29 +56,96 @@ class TabularExtractor:
         else:
             raise ValueError(f"Unsupported file type: {ext}")
     
-    def _extract_csv(self, file_path: str, doc_id: str) -> List[TabularChunk]:
+    def extract_list(self, file_path: str, doc_id: str) -> List[TabularChunk]:
+        """Extract all chunks into a list."""
+        return list(self.extract(file_path, doc_id))
+    
+    def _extract_csv(self, file_path: str, doc_id: str) -> Generator[TabularChunk, None, None]:
         """Extract from CSV file using chunked reading to avoid OOM on large files."""
-        chunks = []
         row_offset = 0
         
         # Stream CSV in batches to handle 500MB+ files without OOM
-        for batch_df in pd.read_csv(file_path, chunksize=1000):
-            batch_chunks = self._chunk_dataframe(batch_df, doc_id, "sheet1", row_offset)
-            chunks.extend(batch_chunks)
+        for batch_df in pd.read_csv(file_path, chunksize=self.rows_per_read):
+            yield from self._chunk_dataframe(batch_df, doc_id, "sheet1", row_offset)
             row_offset += len(batch_df)
-        
-        return chunks
     
-    def _extract_excel(self, file_path: str, doc_id: str) -> List[TabularChunk]:
+    def _extract_excel(self, file_path: str, doc_id: str) -> Generator[TabularChunk, None, None]:
         """Extract from Excel file (all sheets)."""
-        chunks = []
-        xlsx = pd.ExcelFile(file_path)
+        if file_path.lower().endswith('.xlsx'):
+            yield from self._extract_xlsx_streaming(file_path, doc_id)
+            return
         
+        # Legacy .xls is not readable by openpyxl; load one sheet at a time
+        xlsx = pd.ExcelFile(file_path)
         for sheet_name in xlsx.sheet_names:
             df = pd.read_excel(xlsx, sheet_name=sheet_name)
-            chunks.extend(self._chunk_dataframe(df, doc_id, sheet_name, 0))
+            yield from self._chunk_dataframe(df, doc_id, sheet_name, 0)
+    
+    def _extract_xlsx_streaming(
+        self,
+        file_path: str,
+        doc_id: str
+    ) -> Generator[TabularChunk, None, None]:
+        """
+        Stream .xlsx sheets row by row via openpyxl read-only mode.
+        
+        Rows are shaped the way pd.read_excel would read them: blank rows
+        are skipped (sheet dimensions often run past the data), header
+        names are filled in and de-duplicated, and every row is padded or
+        truncated to the header width.
+        """
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            for sheet in workbook.worksheets:
+                rows = (
+                    row for row in sheet.iter_rows(values_only=True)
+                    if any(value is not None for value in row)
+                )
+                header = next(rows, None)
+                if header is None:
+                    continue
+                columns = self._header_columns(header)
+                width = len(columns)
+                
+                row_offset = 0
+                while True:
+                    batch_rows = [
+                        row[:width] if len(row) >= width else row + (None,) * (width - len(row))
+                        for row in islice(rows, self.rows_per_read)
+                    ]
+                    if not batch_rows:
+                        break
+                    df = pd.DataFrame(batch_rows, columns=columns)
+                    yield from self._chunk_dataframe(df, doc_id, sheet.title, row_offset)
+                    row_offset += len(batch_rows)
+        finally:
+            workbook.close()
+    
+    @staticmethod
+    def _header_columns(header: tuple) -> list:
+        """
+        Column names for a header row, as pandas names them.
+        
+        Trailing empty cells are dropped, blanks become "Unnamed: i" and
+        repeats get ".1", ".2", ... suffixes.
+        """
+        header = list(header)
+        while header and header[-1] is None:
+            header.pop()
         
-        return chunks
+        columns = []
+        counts: Dict[Any, int] = {}
+        for i, col in enumerate(header):
+            if col is None:
+                col = f"Unnamed: {i}"
+            count = counts.get(col, 0)
+            while count > 0:
+                counts[col] = count + 1
+                col = f"{col}.{count}"
+                count = counts.get(col, 0)
+            columns.append(col)
+            counts[col] = count + 1
+        return columns
     
     def _chunk_dataframe(
         self, 
@@ -72,29 +153,36 @@ class TabularExtractor:
         doc_id: str, 
         sheet_name: str,
         row_offset: int = 0
-    ) -> List[TabularChunk]:
+    ) -> Generator[TabularChunk, None, None]:
         """Chunk dataframe into row groups with column headers as context."""
-        chunks = []
         columns = df.columns.tolist()
         header_text = " | ".join(str(c) for c in columns)
+        min_words = config.ingestion.tabular_min_embed_words
         
         for i in range(0, len(df), self.rows_per_chunk):
             batch = df.iloc[i:i + self.rows_per_chunk]
             
-            # Serialize rows with headers for each row (better retrieval)
-            rows_text = []
-            for _, row in batch.iterrows():
-                row_parts = [f"{col}: {row[col]}" for col in columns]
-                rows_text.append(" | ".join(row_parts))
+            # Serialize rows with headers for each row (better retrieval).
+            # itertuples keeps each column's dtype, so an int cell in a row
+            # with floats prints as "1", not "1.0" as iterrows gave
+            buf = io.StringIO()
+            buf.write("Columns: ")
+            buf.write(header_text)
+            buf.write("\n\n")
+            for row_idx, row in enumerate(batch.itertuples(index=False, name=None)):
+                if row_idx:
+                    buf.write("\n")
+                buf.write(" | ".join(f"{col}: {val}" for col, val in zip(columns, row)))
             
-            content = f"Columns: {header_text}\n\n" + "\n".join(rows_text)
+            content = buf.getvalue()
             
             absolute_row = row_offset + i
-            chunk_id = hashlib.sha256(
-                f"{doc_id}_{sheet_name}_{absolute_row}".encode()
-            ).hexdigest()[:12]
+            chunk_id = hashlib.blake2b(
+                f"{doc_id}_{sheet_name}_{absolute_row}".encode(),
+                digest_size=6
+            ).hexdigest()
             
-            chunks.append(TabularChunk(
+            yield TabularChunk(
                 chunk_id=f"{doc_id}_{chunk_id}",
                 content_text=content,
                 sheet_name=sheet_name,
@@ -103,14 +191,30 @@ class TabularExtractor:
                 columns=columns,
                 metadata={
                     "file_type": "tabular"
-                }
-            ))
+                },
+                text_like=self._has_words(batch, min_words)
+            )
+    
+    @staticmethod
+    def _has_words(batch: pd.DataFrame, min_words: int) -> bool:
+        """
+        Whether the batch's cell values hold at least min_words words.
         
-        return chunks
+        Column names are ignored (they repeat on every row); only string
+        cells are scanned, stopping as soon as the threshold is reached.
+        """
+        words = 0
+        for values in batch.select_dtypes(include="object").itertuples(index=False, name=None):
+            for value in values:
+                if isinstance(value, str):
+                    words += len(WORD_RE.findall(value))
+                    if words >= min_words:
+                        return True
+        return False
     
     def to_vespa_docs(
         self,
-        chunks: List[TabularChunk],
+        chunks: Iterable[TabularChunk],
         doc_id: str,
         access_scope: str,
         owner_user_id: str = None,
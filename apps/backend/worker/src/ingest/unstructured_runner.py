@@ -9,10 +9,17 @@ ROUTING LOGIC:
 - Scanned pages (text_density < 0.0001): Flag for Gemini OCR
 - Tables/Figures: Always crop and send to Gemini Vision
 """
-from typing import List, Dict, Any, Tuple
+import asyncio
+import multiprocessing
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 import fitz
+import numpy as np
 
 from unstructured.partition.pdf import partition_pdf
 from unstructured.documents.elements import (
@@ -20,10 +27,50 @@ from unstructured.documents.elements import (
     NarrativeText, Title, ListItem
 )
 
+from src.ingest.ingest_cache import get_ingest_cache, make_key
 from shared.config.settings import get_config
 
 config = get_config()
 
+# Shared across runners; created on first async extraction
+_process_pool: Optional[ProcessPoolExecutor] = None
+# One semaphore per event loop: asyncio primitives bind to the loop that
+# first waits on them, and tests or a second worker loop use their own
+_extract_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+def extract_worker_count() -> int:
+    """Number of extraction processes (extract_workers, 0 = one per core)."""
+    cores = os.cpu_count() or 1
+    workers = config.ingestion.extract_workers
+    return cores if workers <= 0 else min(workers, cores)
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Get the worker process pool for partition_pdf.
+    
+    A process pool (not threads) because hi_res layout models hold the GIL
+    while running; sized by extract_workers to bound memory. Workers are
+    spawned rather than forked: the worker process already runs threads
+    (to_thread, MuPDF, aiohttp), and forking a threaded process can
+    deadlock the child on a lock held at fork time.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=extract_worker_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+def _discard_process_pool(pool: ProcessPoolExecutor):
+    """Drop a broken pool so the next get_process_pool() starts a fresh one."""
+    global _process_pool
+    if _process_pool is pool:
+        _process_pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
 class PageType(Enum):
     DIGITAL = "digital"
     SCANNED = "scanned"
@@ -38,10 +85,17 @@ class ExtractedElement:
     bbox: List[float]  # [x0, y0, x1, y1]
     metadata: Dict[str, Any]
     is_scanned: bool = False
+    local_page: int = 0  # 0-based page index within the extracted PDF/batch
 
 class UnstructuredRunner:
     """Runs Unstructured extraction with layout detection."""
     
+    # Bump when extract() output changes, to invalidate cached extractions
+    VERSION = 2
+    
+    # Exact element class -> schema type; subclasses fall back to isinstance
+    _TYPE_MAP = {Table: "table", Image: "figure", FigureCaption: "figure"}
+    
     def __init__(
         self,
         strategy: str = "hi_res",
@@ -82,9 +136,11 @@ class UnstructuredRunner:
         
         extracted = []
         for i, elem in enumerate(elements):
-            page_num = self._get_page_number(elem) + page_offset
+            # Unstructured page numbers are 1-based; page_types is 0-based
+            local_page = self._get_page_number(elem) - 1
+            page_num = local_page + 1 + page_offset
             bbox = self._get_bbox(elem)
-            is_scanned = page_types.get(page_num - page_offset, PageType.DIGITAL) == PageType.SCANNED
+            is_scanned = page_types.get(local_page, PageType.DIGITAL) == PageType.SCANNED
             
             extracted.append(ExtractedElement(
                 element_id=f"elem_{page_num}_{i}",
@@ -93,11 +149,72 @@ class UnstructuredRunner:
                 page_number=page_num,
                 bbox=bbox,
                 metadata=self._extract_metadata(elem),
-                is_scanned=is_scanned
+                is_scanned=is_scanned,
+                local_page=local_page
             ))
         
         return extracted, page_types
     
+    async def extract_async(
+        self,
+        pdf_path: str,
+        page_offset: int = 0,
+        cache_key: Optional[str] = None
+    ) -> Tuple[List[ExtractedElement], Dict[int, PageType]]:
+        """
+        Run extract() in the worker process pool.
+        
+        Keeps the event loop free for Gemini/Vespa I/O while Unstructured
+        partitions the PDF.
+        
+        Args:
+            pdf_path: Path to PDF file
+            page_offset: Page number offset for batched processing
+            cache_key: Identifies the PDF's content (e.g. its sha256); when
+                given, results are memoized in the ingest cache
+        """
+        if cache_key is None:
+            return await self._extract_in_pool(pdf_path, page_offset)
+        
+        cache = get_ingest_cache()
+        key = make_key(
+            "extract", cache_key, self.VERSION, self.strategy,
+            ",".join(self.languages), self.extract_images, page_offset
+        )
+        result = await asyncio.to_thread(cache.get, key)
+        if result is None:
+            result = await self._extract_in_pool(pdf_path, page_offset)
+            await asyncio.to_thread(cache.set, key, result)
+        return result
+    
+    async def _extract_in_pool(
+        self,
+        pdf_path: str,
+        page_offset: int
+    ) -> Tuple[List[ExtractedElement], Dict[int, PageType]]:
+        """Run extract() in the process pool, holding one worker slot."""
+        loop = asyncio.get_running_loop()
+        slots = _extract_slots.get(loop)
+        if slots is None:
+            # Only submit as many PDFs as there are processes; concurrent
+            # ingests wait here rather than queueing inside the pool
+            slots = _extract_slots[loop] = asyncio.Semaphore(extract_worker_count())
+        
+        async with slots:
+            for attempt in range(2):
+                pool = get_process_pool()
+                try:
+                    return await loop.run_in_executor(
+                        pool, self.extract, pdf_path, page_offset
+                    )
+                except BrokenProcessPool:
+                    # A worker died (e.g. OOM-killed), which breaks the pool
+                    # for every caller. Replace it and retry once; a PDF
+                    # that also kills the fresh pool fails here.
+                    _discard_process_pool(pool)
+                    if attempt:
+                        raise
+    
     def _detect_page_types(self, pdf_path: str) -> Dict[int, PageType]:
         """
         Detect if each page is scanned or digital.
@@ -113,13 +230,17 @@ class UnstructuredRunner:
         min_density = config.ingestion.min_text_density
         
         for page_num, page in enumerate(doc):
-            text = page.get_text()
-            images = page.get_images()
+            # Non-whitespace characters, counted per word so the page text
+            # is never joined into one string; whitespace-only pages count
+            # as empty. flags=0 skips ligature/whitespace preservation and
+            # image blocks.
+            char_count = sum(len(w[4]) for w in page.get_text("words", flags=0))
             
             page_area = max(1, page.rect.width * page.rect.height)
-            text_density = len(text.strip()) / page_area
+            text_density = char_count / page_area
             
-            if text_density < min_density and images:
+            # Only look up image xrefs when the page could be scanned
+            if text_density < min_density and page.get_images():
                 # Very little text but has images = scanned
                 # Will be routed to process_scanned_page() in pipeline
                 page_types[page_num] = PageType.SCANNED
@@ -145,14 +266,25 @@ class UnstructuredRunner:
             coords = elem.metadata.coordinates
             if coords and hasattr(coords, 'points'):
                 points = coords.points
+                if len(points) == 4:
+                    # Axis-aligned rectangle: opposite corners bound it
+                    (ax, ay), (bx, by) = points[0], points[2]
+                    return [
+                        float(min(ax, bx)), float(min(ay, by)),
+                        float(max(ax, bx)), float(max(ay, by))
+                    ]
                 if points:
-                    xs = [p[0] for p in points]
-                    ys = [p[1] for p in points]
-                    return [min(xs), min(ys), max(xs), max(ys)]
+                    arr = np.asarray(points, dtype=np.float32)
+                    mn = arr.min(axis=0)
+                    mx = arr.max(axis=0)
+                    return [float(mn[0]), float(mn[1]), float(mx[0]), float(mx[1])]
         return [0, 0, 0, 0]
     
     def _map_element_type(self, elem: Element) -> str:
         """Map Unstructured element type to our schema."""
+        mapped = self._TYPE_MAP.get(type(elem))
+        if mapped is not None:
+            return mapped
         if isinstance(elem, Table):
             return "table"
         elif isinstance(elem, (Image, FigureCaption)):
@@ -7,9 +7,12 @@ import os
 import time
 from typing import List, Dict, Any
 import httpx
+import numpy as np
 from dataclasses import asdict
 
-from src.ingest.chunking import Chunk
+from src.ingest.chunking import Chunk, ChunkBatch
+from src.ingest.http_client import create_http_client
+from shared.clients.vespa_client import VespaClient, JSON_HEADERS
 from shared.config.settings import get_config
 
 config = get_config()
@@ -18,13 +21,15 @@ config = get_config()
 class VespaFeeder:
     """Feeds documents to Vespa."""
     
-    def __init__(self, endpoint: str = None):
+    def __init__(self, endpoint: str = None, http_client: httpx.AsyncClient = None):
         self.endpoint = endpoint or os.getenv("VESPA_ENDPOINT")
         self.document_api = f"{self.endpoint}/document/v1"
+        # Pooled keep-alive connections, usually shared with the pipeline
+        self._http = http_client or create_http_client()
     
     async def feed_chunks(
         self,
-        chunks: List[Chunk],
+        chunks: ChunkBatch,
         access_scope: str,
         owner_user_id: str = None,
         tenant_id: str = None,
@@ -35,7 +40,8 @@ class VespaFeeder:
         Feed chunks to Vespa.
         
         Args:
-            chunks: List of Chunk objects
+            chunks: ChunkBatch; its embeddings/colbert rows are fed with
+                the matching chunk
             access_scope: 'global' or 'private'
             owner_user_id: User ID for private docs
             tenant_id: Tenant ID (defaults to config)
@@ -49,27 +55,35 @@ class VespaFeeder:
         workspace_id = workspace_id or config.default_workspace_id
         stats = {"success": 0, "failed": 0}
         
-        async with httpx.AsyncClient(timeout=30) as client:
-            for i in range(0, len(chunks), batch_size):
-                batch = chunks[i:i + batch_size]
+        # Quantize the whole embedding block at once
+        embeddings = (
+            self._format_embeddings(chunks.embeddings)
+            if chunks.embeddings is not None else None
+        )
+        
+        for i in range(0, len(chunks), batch_size):
+            for j in range(i, min(i + batch_size, len(chunks))):
+                chunk = chunks.chunks[j]
+                doc = self._chunk_to_vespa_doc(
+                    chunk, access_scope, owner_user_id, tenant_id, workspace_id,
+                    embedding=embeddings[j] if embeddings is not None else None,
+                    colbert_tokens=chunks.colbert[j] if chunks.colbert else None
+                )
                 
-                for chunk in batch:
-                    doc = self._chunk_to_vespa_doc(
-                        chunk, access_scope, owner_user_id, tenant_id, workspace_id
+                try:
+                    response = await self._http.post(
+                        f"{self.document_api}/sop_elements/docid/{chunk.chunk_id}",
+                        content=VespaClient.dumps(doc),
+                        headers=JSON_HEADERS,
+                        timeout=30
                     )
                     
-                    try:
-                        response = await client.post(
-                            f"{self.document_api}/sop_elements/docid/{chunk.chunk_id}",
-                            json=doc
-                        )
-                        
-                        if response.status_code in (200, 201):
-                            stats["success"] += 1
-                        else:
-                            stats["failed"] += 1
-                    except Exception:
+                    if response.status_code in (200, 201):
+                        stats["success"] += 1
+                    else:
                         stats["failed"] += 1
+                except Exception:
+                    stats["failed"] += 1
         
         return stats
     
@@ -90,26 +104,31 @@ class VespaFeeder:
         """
         stats = {"success": 0, "failed": 0}
         
-        async with httpx.AsyncClient(timeout=30) as client:
-            for i in range(0, len(docs), batch_size):
-                batch = docs[i:i + batch_size]
-                
-                for doc in batch:
-                    element_id = doc.get("element_id", doc.get("chunk_id", "unknown"))
-                    vespa_doc = {"fields": doc}
+        for i in range(0, len(docs), batch_size):
+            batch = docs[i:i + batch_size]
+            
+            for doc in batch:
+                element_id = doc.get("element_id", doc.get("chunk_id", "unknown"))
+                vespa_doc = {"fields": doc}
+                if doc.get("embedding") is not None:
+                    vespa_doc["fields"] = {
+                        **doc, "embedding": self._format_embedding(doc["embedding"])
+                    }
                     
-                    try:
-                        response = await client.post(
-                            f"{self.document_api}/sop_elements/docid/{element_id}",
-                            json=vespa_doc
-                        )
-                        
-                        if response.status_code in (200, 201):
-                            stats["success"] += 1
-                        else:
-                            stats["failed"] += 1
-                    except Exception:
+                try:
+                    response = await self._http.post(
+                        f"{self.document_api}/sop_elements/docid/{element_id}",
+                        content=VespaClient.dumps(vespa_doc),
+                        headers=JSON_HEADERS,
+                        timeout=30
+                    )
+                    
+                    if response.status_code in (200, 201):
+                        stats["success"] += 1
+                    else:
                         stats["failed"] += 1
+                except Exception:
+                    stats["failed"] += 1
         
         return stats
     
@@ -119,9 +138,16 @@ class VespaFeeder:
         access_scope: str,
         owner_user_id: str = None,
         tenant_id: str = None,
-        workspace_id: str = None
+        workspace_id: str = None,
+        embedding: Dict[str, str] = None,
+        colbert_tokens: Any = None
     ) -> Dict[str, Any]:
-        """Convert Chunk to Vespa document format."""
+        """
+        Convert Chunk to Vespa document format.
+        
+        embedding is an already formatted dense tensor (see
+        _format_embeddings); colbert_tokens is the raw (tokens, 128) array.
+        """
         doc = {
             "fields": {
                 "doc_id": chunk.doc_id,
@@ -146,40 +172,83 @@ class VespaFeeder:
             doc["fields"]["figure_caption"] = chunk.metadata["figure_caption"]
         if chunk.metadata.get("crop_uri"):
             doc["fields"]["crop_uri"] = chunk.metadata["crop_uri"]
-        if chunk.metadata.get("embedding"):
-            doc["fields"]["embedding"] = {"values": chunk.metadata["embedding"].tolist()}
-        if chunk.metadata.get("colbert_tokens"):
-            doc["fields"]["colbert_tokens"] = self._format_colbert(chunk.metadata["colbert_tokens"])
+        if embedding is not None:
+            doc["fields"]["embedding"] = embedding
+        if colbert_tokens is not None:
+            doc["fields"]["colbert_tokens"] = self._format_colbert(colbert_tokens)
         
         return doc
     
+    @classmethod
+    def _format_embedding(cls, vector: Any) -> Dict[str, str]:
+        """Quantize a single dense embedding (see _format_embeddings)."""
+        return cls._format_embeddings(np.asarray(vector, dtype=np.float32)[None, :])[0]
+    
+    @staticmethod
+    def _format_embeddings(vectors: np.ndarray) -> List[Dict[str, str]]:
+        """
+        Quantize a block of dense embeddings to the int8 field as hex cells.
+        
+        Each row is scaled to the int8 range. The embedding field uses
+        angular distance, which ignores vector scale, so the scale factor
+        doesn't need to be stored.
+        """
+        values = np.asarray(vectors, dtype=np.float32)
+        if len(values) == 0:
+            return []
+        peaks = np.max(np.abs(values), axis=1, keepdims=True)
+        scales = np.divide(127.0, peaks, out=np.ones_like(peaks), where=peaks > 0)
+        quantized = np.clip(np.round(values * scales), -128, 127).astype(np.int8)
+        return [{"values": row.tobytes().hex()} for row in quantized]
+    
     def _format_colbert(self, tokens: Any) -> Dict:
-        """Format ColBERT tokens for Vespa tensor format."""
-        cells = []
-        for i, token_vec in enumerate(tokens):
-            for j, val in enumerate(token_vec):
-                cells.append({
-                    "address": {"token": str(i), "x": str(j)},
-                    "value": float(val)
-                })
-        return {"cells": cells}
+        """
+        Format ColBERT tokens for Vespa tensor format.
+        
+        Uses the mixed-tensor block form (one dense x[128] block per token),
+        with cells rounded to bfloat16 and hex-encoded.
+        """
+        bits = np.ascontiguousarray(tokens, dtype=np.float32).view(np.uint32)
+        # Round to nearest even, keep the upper 16 bits (big-endian cells)
+        bf16 = ((bits + 0x7FFF + ((bits >> 16) & 1)) >> 16).astype(">u2")
+        return {"blocks": {str(i): row.tobytes().hex() for i, row in enumerate(bf16)}}
     
     async def delete_document(self, doc_id: str) -> bool:
         """Delete a document from Vespa."""
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.delete(
-                f"{self.document_api}/sop_elements/docid/{doc_id}"
-            )
-            return response.status_code == 200
+        response = await self._http.delete(
+            f"{self.document_api}/sop_elements/docid/{doc_id}",
+            timeout=10
+        )
+        return response.status_code == 200
     
     async def delete_by_owner(self, owner_user_id: str) -> int:
-        """Delete all documents owned by a user."""
-        async with httpx.AsyncClient(timeout=60) as client:
-            response = await client.delete(
+        """
+        Delete all documents owned by a user.
+        
+        Selection deletes are processed in slices; keep following the
+        continuation token until Vespa reports the visit is complete.
+        """
+        owner = VespaClient.selection_literal(owner_user_id)
+        params = {
+            "selection": f"sop_elements.owner_user_id == {owner}",
+            "cluster": "sop_content"
+        }
+        deleted = 0
+        
+        while True:
+            response = await self._http.delete(
                 f"{self.document_api}/sop_elements/docid/",
-                params={
-                    "selection": f"sop_elements.owner_user_id == '{owner_user_id}'",
-                    "cluster": "sop_content"
-                }
+                params=params,
+                timeout=60
             )
-            return response.json().get("documentCount", 0)
+            response.raise_for_status()
+            
+            body = response.json()
+            deleted += body.get("documentCount", 0)
+            
+            continuation = body.get("continuation")
+            if not continuation:
+                break
+            params["continuation"] = continuation
+        
+        return deleted
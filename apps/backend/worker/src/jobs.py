@@ -0,0 +1,65 @@
+"""
+Ingestion Job Queue
+
+Arq worker that runs ingestion jobs outside the HTTP process.
+
+Run with:
+    arq src.jobs.WorkerSettings
+
+The API process only enqueues jobs (see main.py), so long admin ingests
+cannot starve /health or other requests, and a crashed job does not take
+the API down with it.
+"""
+import os
+import logging
+from typing import Dict, Any
+
+from arq.connections import RedisSettings
+
+logger = logging.getLogger(__name__)
+
+ADMIN_INGEST_JOB = "admin_ingest"
+USER_INGEST_JOB = "user_ingest"
+
+
+def get_redis_settings() -> RedisSettings:
+    """Redis connection for the job queue (REDIS_URL)."""
+    return RedisSettings.from_dsn(os.getenv("REDIS_URL", "redis://localhost:6379"))
+
+
+async def startup(ctx: Dict[str, Any]):
+    """Build pipelines once per worker process."""
+    from src.pipelines.admin_ingest import AdminIngestionPipeline
+    from src.pipelines.user_ingest import UserIngestionPipeline
+    
+    ctx["admin_pipeline"] = AdminIngestionPipeline()
+    ctx["user_pipeline"] = UserIngestionPipeline()
+
+
+async def shutdown(ctx: Dict[str, Any]):
+    """Close pipeline connection pools and finish scratch file cleanup."""
+    from src.ingest.scratch import drain_removals
+    
+    for key in ("admin_pipeline", "user_pipeline"):
+        if key in ctx:
+            await ctx[key].aclose()
+    await drain_removals()
+
+
+async def admin_ingest(ctx: Dict[str, Any], doc_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    logger.info(f"Running admin ingest job for doc_id={doc_id}")
+    return await ctx["admin_pipeline"].ingest(doc_id, metadata)
+
+
+async def user_ingest(ctx: Dict[str, Any], doc_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    logger.info(f"Running user ingest job for doc_id={doc_id}")
+    return await ctx["user_pipeline"].ingest(doc_id, metadata)
+
+
+class WorkerSettings:
+    functions = [admin_ingest, user_ingest]
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = get_redis_settings()
+    max_jobs = int(os.getenv("INGEST_MAX_JOBS", "2"))
+    job_timeout = int(os.getenv("INGEST_JOB_TIMEOUT", str(6 * 60 * 60)))
@@ -1,7 +1,10 @@
 from fastapi import FastAPI, BackgroundTasks
 from pydantic import BaseModel
 from typing import Dict, Any
+import asyncio
 import logging
+import os
+import threading
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -11,21 +14,63 @@ app = FastAPI(title="GeneralRAG Worker")
 # Lazy load pipelines to avoid import errors blocking startup
 admin_pipeline = None
 user_pipeline = None
+# Startup warm-up runs in a thread; don't let a request build a second copy
+_pipeline_lock = threading.Lock()
 
 def get_admin_pipeline():
     global admin_pipeline
-    if admin_pipeline is None:
-        from src.pipelines.admin_ingest import AdminIngestionPipeline
-        admin_pipeline = AdminIngestionPipeline()
+    with _pipeline_lock:
+        if admin_pipeline is None:
+            from src.pipelines.admin_ingest import AdminIngestionPipeline
+            admin_pipeline = AdminIngestionPipeline()
     return admin_pipeline
 
 def get_user_pipeline():
     global user_pipeline
-    if user_pipeline is None:
-        from src.pipelines.user_ingest import UserIngestionPipeline
-        user_pipeline = UserIngestionPipeline()
+    with _pipeline_lock:
+        if user_pipeline is None:
+            from src.pipelines.user_ingest import UserIngestionPipeline
+            user_pipeline = UserIngestionPipeline()
     return user_pipeline
 
+# Arq job queue (REDIS_URL); without it jobs run as in-process background tasks
+job_queue = None
+
+@app.on_event("startup")
+async def connect_job_queue():
+    global job_queue
+    if os.getenv("REDIS_URL"):
+        from arq import create_pool
+        from src.jobs import get_redis_settings
+        job_queue = await create_pool(get_redis_settings())
+        logger.info("Ingestion jobs will be enqueued to Redis")
+
+@app.on_event("startup")
+async def warm_pipelines():
+    """Build pipelines off the event loop so the first ingest isn't a cold start."""
+    if job_queue is not None:
+        return  # Jobs run in the arq worker, which builds its own pipelines
+    try:
+        await asyncio.to_thread(get_admin_pipeline)
+        await asyncio.to_thread(get_user_pipeline)
+    except Exception as e:
+        # Fall back to lazy loading on first request
+        logger.warning(f"Pipeline warm-up failed: {e}")
+
+@app.on_event("shutdown")
+async def close_job_queue():
+    if job_queue is not None:
+        await job_queue.close()
+
+@app.on_event("shutdown")
+async def close_pipelines():
+    """Release pooled connections held by built pipelines; finish file cleanup."""
+    for pipeline in (admin_pipeline, user_pipeline):
+        if pipeline is not None:
+            await pipeline.aclose()
+    from src.ingest.scratch import drain_removals
+    await drain_removals()
+
 class IngestRequest(BaseModel):
     doc_id: str
     metadata: Dict[str, Any]
@@ -38,6 +83,10 @@ async def health():
 async def ingest_admin(request: IngestRequest, background_tasks: BackgroundTasks):
     """Trigger admin document ingestion."""
     logger.info(f"Received admin ingest request for doc_id={request.doc_id}")
+    if job_queue is not None:
+        from src.jobs import ADMIN_INGEST_JOB
+        job = await job_queue.enqueue_job(ADMIN_INGEST_JOB, request.doc_id, request.metadata)
+        return {"status": "queued", "doc_id": request.doc_id, "job_id": job.job_id}
     pipeline = get_admin_pipeline()
     background_tasks.add_task(pipeline.ingest, request.doc_id, request.metadata)
     return {"status": "started", "doc_id": request.doc_id}
@@ -46,6 +95,10 @@ async def ingest_admin(request: IngestRequest, background_tasks: BackgroundTasks
 async def ingest_user(request: IngestRequest, background_tasks: BackgroundTasks):
     """Trigger user document ingestion."""
     logger.info(f"Received user ingest request for doc_id={request.doc_id}")
+    if job_queue is not None:
+        from src.jobs import USER_INGEST_JOB
+        job = await job_queue.enqueue_job(USER_INGEST_JOB, request.doc_id, request.metadata)
+        return {"status": "queued", "doc_id": request.doc_id, "job_id": job.job_id}
     pipeline = get_user_pipeline()
     background_tasks.add_task(pipeline.ingest, request.doc_id, request.metadata)
     return {"status": "started", "doc_id": request.doc_id}
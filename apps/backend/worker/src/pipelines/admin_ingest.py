@@ -4,38 +4,90 @@ Admin Ingestion Pipeline
 Full pipeline for admin-uploaded documents (global scope).
 Handles large PDFs with batching, vision processing, and indexing.
 """
+import asyncio
+import logging
 import os
-import tempfile
-from typing import Dict, Any
-from google.cloud import storage
+from itertools import groupby
+from operator import attrgetter
+from typing import Dict, Any, Tuple
+import fitz
+from gcloud.aio.storage import Storage
 
 from src.ingest.split_pdf import PDFSplitter
-from src.ingest.unstructured_runner import UnstructuredRunner, PageType
+from src.ingest.unstructured_runner import (
+    UnstructuredRunner, PageType, extract_worker_count
+)
 from src.ingest.gemini_vision import GeminiVision
-from src.ingest.chunking import ParentChildChunker
+from src.ingest.chunking import ParentChildChunker, StreamingChunker, ChunkBatch
 from src.ingest.embeddings import EmbeddingGenerator
+from src.ingest.embedding_cache import get_embedding_cache
 from src.ingest.vespa_feed import VespaFeeder
+from src.ingest.http_client import create_http_client
+from src.ingest.ingest_cache import get_ingest_cache, make_key
+from src.ingest.scratch import remove_later
+from src.ingest.mupdf_executor import run_mupdf
 from src.ingest.reconciliation import ReconciliationPass
+from src.ingest.gcs_io import download_to_tempfile
 from src.retries_qos import with_retry, IngestionError
 from shared.config.settings import get_config
 
 config = get_config()
 
+def _leaf_exceptions(e: BaseException):
+    """Yield e, or every non-group exception nested inside it."""
+    if isinstance(e, BaseExceptionGroup):
+        for sub in e.exceptions:
+            yield from _leaf_exceptions(sub)
+    else:
+        yield e
+
 class AdminIngestionPipeline:
     """Pipeline for admin document ingestion."""
     
+    CROP_UPLOAD_CONCURRENCY = 16  # parallel crop uploads to GCS
+    
     def __init__(self):
-        self.splitter = PDFSplitter()
         self.extractor = UnstructuredRunner(strategy="hi_res")
-        self.vision = GeminiVision()
+        self.http = create_http_client()
+        self.vision = GeminiVision(http_client=self.http)
         self.chunker = ParentChildChunker()
-        self.embedder = EmbeddingGenerator()
-        self.feeder = VespaFeeder()
+        self.embedder = EmbeddingGenerator(cache=get_embedding_cache())
+        self.feeder = VespaFeeder(http_client=self.http)
+        self.ocr = self._load_local_ocr() if config.ingestion.local_ocr else None
         
-        self.storage_client = storage.Client()
+        # Created on first use (see aio_storage)
+        self._aio_storage = None
+        self._upload_semaphore = asyncio.Semaphore(self.CROP_UPLOAD_CONCURRENCY)
         self.raw_bucket = os.getenv("RAW_PDFS_BUCKET")
         self.crops_bucket = os.getenv("PAGE_CROPS_BUCKET")
     
+    @property
+    def aio_storage(self) -> Storage:
+        """
+        GCS client, created on first use.
+        
+        Its aiohttp session binds to the running event loop, so it can't be
+        built in __init__, which may run in a thread (startup warm-up).
+        """
+        if self._aio_storage is None:
+            self._aio_storage = Storage()
+        return self._aio_storage
+    
+    async def aclose(self):
+        """Close pooled HTTP connections and the GCS session."""
+        await self.http.aclose()
+        if self._aio_storage is not None:
+            await self._aio_storage.close()
+    
+    def _load_local_ocr(self):
+        """Load the local OCR model; None keeps scanned pages on Gemini."""
+        try:
+            from src.ingest.local_ocr import LocalOCR
+            return LocalOCR()
+        except Exception as e:
+            logging.warning(f"Local OCR unavailable, using Gemini for scanned pages: {e}")
+            return None
+    
     async def ingest(self, doc_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """
         Run full ingestion pipeline for admin document.
@@ -56,61 +108,27 @@ class AdminIngestionPipeline:
             "errors": []
         }
         
+        local_path = None
         try:
             # Download PDF from GCS
-            local_path = await self._download_pdf(metadata["gcs_uri"])
-            
-            # Get PDF info
-            pdf_info = self.splitter.get_page_info(local_path)
-            stats["total_pages"] = pdf_info["total_pages"]
-            stats["file_size_mb"] = pdf_info["file_size_mb"]
-            
-            all_elements = []
-            
-            # Process in batches
-            for batch in self.splitter.iter_batches(local_path):
-                try:
-                    batch_elements = await self._process_batch(
-                        batch, doc_id, metadata
-                    )
-                    all_elements.extend(batch_elements)
-                    stats["batches_processed"] += 1
-                except Exception as e:
-                    stats["errors"].append({
-                        "batch_id": batch.batch_id,
-                        "error": str(e)
-                    })
-                finally:
-                    # Cleanup batch file
-                    if os.path.exists(batch.temp_path):
-                        os.remove(batch.temp_path)
+            local_path, pdf_sha256 = await self._download_pdf(metadata["gcs_uri"])
             
-            stats["elements_extracted"] = len(all_elements)
-            
-            # Chunk elements
-            chunks = self.chunker.chunk_elements(all_elements, doc_id)
-            
-            # Generate embeddings
-            texts = [c.content_text for c in chunks]
-            embeddings, colbert_embeddings = self.embedder.batch_embed(
-                texts, include_colbert=True
-            )
-            
-            # Add embeddings to chunks
-            for i, chunk in enumerate(chunks):
-                chunk.metadata["embedding"] = embeddings[i]
-                if colbert_embeddings:
-                    chunk.metadata["colbert_tokens"] = colbert_embeddings[i]
-            
-            # Feed to Vespa
-            feed_stats = await self.feeder.feed_chunks(
-                chunks,
-                access_scope="global",
-                owner_user_id=None
-            )
-            
-            stats["chunks_indexed"] = feed_stats["success"]
-            stats["index_failures"] = feed_stats["failed"]
+            # Parse the PDF once for page info and batch splitting
+            splitter = await run_mupdf(PDFSplitter().open, local_path)
+            try:
+                # Get PDF info (cached per PDF content)
+                pdf_info = await self._get_page_info(splitter, pdf_sha256)
+                stats["total_pages"] = pdf_info["total_pages"]
+                stats["file_size_mb"] = pdf_info["file_size_mb"]
+                
+                # Process in batches; each batch is chunked, embedded and
+                # fed as soon as all earlier batches have been
+                stats["index_failures"] = 0
+                await self._run_batches(
+                    splitter, doc_id, metadata, stats, pdf_sha256
+                )
+            finally:
+                await run_mupdf(splitter.close)
             
             # Run reconciliation pass if enabled
             if config.ingestion.run_reconciliation:
@@ -124,98 +142,342 @@ class AdminIngestionPipeline:
             
             stats["status"] = "completed"
             
-            # Cleanup
-            os.remove(local_path)
-            
         except Exception as e:
             stats["status"] = "failed"
-            stats["errors"].append({"stage": "pipeline", "error": str(e)})
+            # Stage failures arrive wrapped in (nested) TaskGroup exception
+            # groups; record the underlying errors, not the wrapper
+            for err in _leaf_exceptions(e):
+                stats["errors"].append({
+                    "stage": "pipeline",
+                    "error": str(err),
+                    "error_type": type(err).__name__
+                })
+        
+        finally:
+            # Cleanup (on failure too: scratch may be RAM-backed tmpfs)
+            if local_path is not None:
+                remove_later(local_path)
         
         return stats
     
-    async def _download_pdf(self, gcs_uri: str) -> str:
-        """Download PDF from GCS to local temp file."""
-        bucket_name = gcs_uri.split("/")[2]
-        blob_path = "/".join(gcs_uri.split("/")[3:])
+    async def _download_pdf(self, gcs_uri: str) -> Tuple[str, str]:
+        """Stream PDF from GCS to local temp file; returns (path, sha256)."""
+        return await download_to_tempfile(self.aio_storage, gcs_uri, suffix=".pdf")
+    
+    async def _get_page_info(self, splitter: PDFSplitter, pdf_sha256: str) -> dict:
+        """Page info for the open PDF, memoized by content hash."""
+        cache = get_ingest_cache()
+        key = make_key("page_info", pdf_sha256)
+        pdf_info = await asyncio.to_thread(cache.get, key)
+        if pdf_info is None:
+            pdf_info = await run_mupdf(splitter.get_page_info)
+            await asyncio.to_thread(cache.set, key, pdf_info)
+        return pdf_info
+    
+    async def _run_batches(
+        self,
+        splitter: PDFSplitter,
+        doc_id: str,
+        metadata: Dict,
+        stats: Dict[str, Any],
+        pdf_sha256: str
+    ):
+        """
+        Split, extract, vision-process and index batches as overlapping stages.
+        
+        split -> extract_q -> extract workers -> vision_q -> vision workers
+              -> index_q -> indexer
+        
+        Bounded queues let batch N+1 be extracted while batch N waits on
+        Gemini. The indexer reorders batches into page order and streams
+        them through chunk -> embed -> feed. A batch is only split once a
+        window slot is free, and slots are freed as the indexer consumes
+        batches in order, so a slow early batch can't let later results
+        pile up: at most the window's worth of batches is held at once.
+        """
+        queue_size = config.ingestion.pipeline_queue_size
+        extract_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        vision_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        n_extract = extract_worker_count()
+        n_vision = max(1, config.ingestion.vision_workers)
+        index_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # Batches split but not yet consumed by the indexer: enough to keep
+        # every worker and queue busy, and no more
+        window = asyncio.Semaphore(n_extract + n_vision + queue_size)
+        # Batch files written and not yet removed. If a failure cancels the
+        # stages, batches still queued or in flight are removed on the way out
+        live_paths: set = set()
+        
+        def release(batch):
+            live_paths.discard(batch.temp_path)
+            self._remove_batch_file(batch)
+        
+        async def fail_batch(batch, e: Exception):
+            stats["errors"].append({
+                "batch_id": batch.batch_id,
+                "error": str(e)
+            })
+            release(batch)
+            # Keep the indexer's page order moving past the failed batch
+            await index_q.put((batch.batch_id, []))
+        
+        async def split():
+            batches = splitter.iter_batches()
+            
+            def next_batch():
+                # Track the file as soon as it's written, even if split() is
+                # cancelled while waiting for it
+                batch = next(batches, None)
+                if batch is not None:
+                    live_paths.add(batch.temp_path)
+                return batch
+            
+            try:
+                while True:
+                    await window.acquire()
+                    # Writing a batch file is blocking MuPDF work
+                    batch = await run_mupdf(next_batch)
+                    if batch is None:
+                        break
+                    await extract_q.put(batch)
+            finally:
+                # Finish the generator on the MuPDF thread, not at GC
+                await run_mupdf(batches.close)
+            for _ in range(n_extract):
+                await extract_q.put(None)
+        
+        async def extract_worker():
+            while (batch := await extract_q.get()) is not None:
+                try:
+                    # Batch ranges follow the splitter's batch sizing, so
+                    # the range is part of what identifies the batch
+                    elements, _ = await self.extractor.extract_async(
+                        batch.temp_path,
+                        page_offset=batch.start_page,
+                        cache_key=f"{pdf_sha256}:{batch.start_page}-{batch.end_page}"
+                    )
+                except Exception as e:
+                    await fail_batch(batch, e)
+                    continue
+                await vision_q.put((batch, elements))
+        
+        async def vision_worker():
+            while (item := await vision_q.get()) is not None:
+                batch, elements = item
+                try:
+                    processed = await self._process_batch(
+                        batch, elements, doc_id, metadata
+                    )
+                    stats["batches_processed"] += 1
+                except Exception as e:
+                    await fail_batch(batch, e)
+                else:
+                    release(batch)
+                    await index_q.put((batch.batch_id, processed))
+        
+        async def indexer():
+            stream = StreamingChunker(self.chunker, doc_id)
+            pending: Dict[int, list] = {}
+            next_batch = 0
+            while (item := await index_q.get()) is not None:
+                pending[item[0]] = item[1]
+                while next_batch in pending:
+                    elements = pending.pop(next_batch)
+                    next_batch += 1
+                    window.release()
+                    stats["elements_extracted"] += len(elements)
+                    await self._index_chunks(stream.push(elements), stats)
+            await self._index_chunks(stream.flush(), stats)
+        
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tg.create_task(indexer())
+                
+                async with asyncio.TaskGroup() as vision_tg:
+                    for _ in range(n_vision):
+                        vision_tg.create_task(vision_worker())
+                    
+                    async with asyncio.TaskGroup() as extract_tg:
+                        extract_tg.create_task(split())
+                        for _ in range(n_extract):
+                            extract_tg.create_task(extract_worker())
+                    
+                    for _ in range(n_vision):
+                        await vision_q.put(None)
+                
+                await index_q.put(None)
+        finally:
+            for path in live_paths:
+                remove_later(path)
+    
+    async def _index_chunks(self, chunks: ChunkBatch, stats: Dict[str, Any]):
+        """Embed and feed a group of chunks to Vespa."""
+        if not chunks:
+            return
+        
+        # Generate embeddings (sync client; keep the event loop free)
+        embeddings, colbert_embeddings = await asyncio.to_thread(
+            self.embedder.batch_embed, chunks.texts, include_colbert=True
+        )
+        chunks.embeddings = embeddings
+        chunks.colbert = colbert_embeddings or None
+        
+        # Feed to Vespa
+        feed_stats = await self.feeder.feed_chunks(
+            chunks,
+            access_scope="global",
+            owner_user_id=None
+        )
+        
+        stats["chunks_indexed"] += feed_stats["success"]
+        stats["index_failures"] += feed_stats["failed"]
+    
+    async def _ocr_pages(
+        self,
+        batch,
+        scanned_pages: Dict[int, list],
+        page_images: Dict[int, bytes]
+    ) -> list:
+        """
+        OCR a batch's scanned pages locally in one pass.
+        
+        Each page's text is assigned to every element on it. On failure,
+        returns Gemini vision jobs for those elements.
+        """
+        try:
+            texts = await asyncio.to_thread(
+                self.ocr.recognize,
+                [page_images[local_page] for local_page in scanned_pages]
+            )
+        except Exception as e:
+            logging.warning(
+                f"Local OCR failed for batch {batch.batch_id}, falling back to Gemini: {e}"
+            )
+            return [
+                (elem, page_images[local_page], self.vision.process_scanned_page)
+                for local_page, elems in scanned_pages.items()
+                for elem in elems
+            ]
+        
+        for elems, text in zip(scanned_pages.values(), texts):
+            for elem in elems:
+                elem.content = text
+        return []
+    
+    def _remove_batch_file(self, batch):
+        """Cleanup batch file (in the background)."""
+        remove_later(batch.temp_path)
+    
+    def _render_visual(
+        self,
+        batch_path: str,
+        visual: list
+    ) -> Tuple[list, Dict[int, list], Dict[int, bytes]]:
+        """
+        Crop/render a batch's visual elements (MuPDF thread only).
         
-        bucket = self.storage_client.bucket(bucket_name)
-        blob = bucket.blob(blob_path)
+        Returns:
+            (Gemini jobs, scanned elements by page for local OCR,
+             page renders by page)
+        """
+        jobs = []
+        scanned_pages: Dict[int, list] = {}
+        page_images: Dict[int, bytes] = {}
         
-        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
-            blob.download_to_filename(f.name)
-            return f.name
+        visual = sorted(visual, key=attrgetter("local_page"))
+        
+        pdf = fitz.open(batch_path)
+        try:
+            for local_page, page_elems in groupby(visual, key=attrgetter("local_page")):
+                page = pdf.load_page(local_page)
+                for elem in page_elems:
+                    # Route based on element type and page type
+                    if elem.element_type == "table":
+                        crop_bytes = self.vision.crop_page(page, elem.bbox)
+                        jobs.append((elem, crop_bytes, self.vision.process_table))
+                    elif elem.element_type == "figure":
+                        crop_bytes = self.vision.crop_page(page, elem.bbox)
+                        jobs.append((elem, crop_bytes, self.vision.process_figure))
+                    else:
+                        if local_page not in page_images:
+                            page_images[local_page] = self.vision.render_loaded_page(page)
+                        if self.ocr is not None:
+                            scanned_pages.setdefault(local_page, []).append(elem)
+                            continue
+                        # OCR scanned page with Gemini
+                        jobs.append((
+                            elem, page_images[local_page], self.vision.process_scanned_page
+                        ))
+        finally:
+            pdf.close()
+        
+        return jobs, scanned_pages, page_images
     
     async def _process_batch(
         self,
         batch,
+        elements: list,
         doc_id: str,
         metadata: Dict
     ) -> list:
-        """Process a single batch of pages."""
-        # Extract elements
-        elements, page_types = self.extractor.extract(
-            batch.temp_path,
-            page_offset=batch.start_page
+        """Run vision processing over a batch's extracted elements."""
+        # Crop/render every visual region first so the Gemini calls can be
+        # issued together (GeminiVision bounds how many run at once).
+        # The batch PDF is opened once on the MuPDF thread; visual elements
+        # are grouped by page so each page is loaded (and, if scanned,
+        # rendered) once.
+        visual = [
+            elem for elem in elements
+            if elem.element_type in ("table", "figure") or elem.is_scanned
+        ]
+        jobs, scanned_pages, page_images = await run_mupdf(
+            self._render_visual, batch.temp_path, visual
         )
         
-        processed_elements = []
+        if scanned_pages:
+            jobs.extend(await self._ocr_pages(batch, scanned_pages, page_images))
+        
+        results = await asyncio.gather(
+            *(process(image_bytes, elem.element_id) for elem, image_bytes, process in jobs),
+            return_exceptions=True
+        )
         
-        for elem in elements:
-            # Route based on element type and page type
+        crops = []
+        for (elem, image_bytes, _), result in zip(jobs, results):
+            if isinstance(result, BaseException):
+                raise result
+            
             if elem.element_type == "table":
-                # Process table with Gemini
-                crop_bytes = self.vision.crop_region(
-                    batch.temp_path,
-                    elem.page_number - batch.start_page,
-                    elem.bbox
-                )
-                result = await self.vision.process_table(crop_bytes, elem.element_id)
-                
-                # Upload crop to GCS
-                crop_uri = await self._upload_crop(
-                    crop_bytes, doc_id, elem.element_id
-                )
-                
                 elem.metadata["html"] = result.content
-                elem.metadata["crop_uri"] = crop_uri
-                
+                crops.append((elem, image_bytes))
             elif elem.element_type == "figure":
-                # Process figure with Gemini
-                crop_bytes = self.vision.crop_region(
-                    batch.temp_path,
-                    elem.page_number - batch.start_page,
-                    elem.bbox
-                )
-                result = await self.vision.process_figure(crop_bytes, elem.element_id)
-                
-                crop_uri = await self._upload_crop(
-                    crop_bytes, doc_id, elem.element_id
-                )
-                
                 elem.metadata["figure_caption"] = result.content
-                elem.metadata["crop_uri"] = crop_uri
-                
-            elif elem.is_scanned:
-                # OCR scanned page with Gemini
-                page_bytes = self.vision.render_page(
-                    batch.temp_path,
-                    elem.page_number - batch.start_page
-                )
-                result = await self.vision.process_scanned_page(
-                    page_bytes, elem.element_id
-                )
+                crops.append((elem, image_bytes))
+            else:
                 elem.content = result.content
-            
-            processed_elements.append({
+        
+        # Upload all crops to GCS in parallel
+        crop_uris = dict(zip(
+            (elem.element_id for elem, _ in crops),
+            await asyncio.gather(*(
+                self._upload_crop(image_bytes, doc_id, elem.element_id)
+                for elem, image_bytes in crops
+            ))
+        ))
+        for elem, _ in crops:
+            elem.metadata["crop_uri"] = crop_uris[elem.element_id]
+        
+        return [
+            {
                 "element_id": elem.element_id,
                 "element_type": elem.element_type,
                 "content": elem.content,
                 "page_number": elem.page_number,
                 "bbox": elem.bbox,
                 "metadata": elem.metadata
-            })
-        
-        return processed_elements
+            }
+            for elem in elements
+        ]
     
     async def _upload_crop(
         self,
@@ -224,10 +486,11 @@ class AdminIngestionPipeline:
         element_id: str
     ) -> str:
         """Upload crop image to GCS."""
-        bucket = self.storage_client.bucket(self.crops_bucket)
-        blob_path = f"{doc_id}/{element_id}.png"
-        blob = bucket.blob(blob_path)
+        blob_path = f"{doc_id}/{element_id}.jpg"
         
-        blob.upload_from_string(image_bytes, content_type="image/png")
+        async with self._upload_semaphore:
+            await self.aio_storage.upload(
+                self.crops_bucket, blob_path, image_bytes, content_type=self.vision.IMAGE_MIME_TYPE
+            )
         
         return f"gs://{self.crops_bucket}/{blob_path}"
@@ -4,10 +4,11 @@ User Ingestion Pipeline
 Pipeline for user-uploaded documents (private scope).
 Supports PDF, CSV, and Excel files.
 """
+import asyncio
 import os
-import tempfile
+from itertools import islice
 from typing import Dict, Any
-from google.cloud import storage
+from gcloud.aio.storage import Storage
 
 from src.ingest.file_router import FileRouter, FileType
 from src.ingest.tabular_extractor import TabularExtractor
@@ -15,7 +16,12 @@ from src.ingest.unstructured_runner import UnstructuredRunner
 from src.ingest.gemini_vision import GeminiVision
 from src.ingest.chunking import ParentChildChunker
 from src.ingest.embeddings import EmbeddingGenerator
+from src.ingest.embedding_cache import get_embedding_cache
 from src.ingest.vespa_feed import VespaFeeder
+from src.ingest.http_client import create_http_client
+from src.ingest.gcs_io import download_to_tempfile, parse_gcs_uri
+from src.ingest.scratch import remove_later
+from src.ingest.mupdf_executor import run_mupdf
 from shared.config.settings import get_config
 
 config = get_config()
@@ -23,18 +29,40 @@ config = get_config()
 class UserIngestionPipeline:
     """Pipeline for user document ingestion (PDF, CSV, Excel)."""
     
+    TABULAR_FEED_BATCH = 500  # chunks embedded and fed per round
+    
     def __init__(self):
         self.extractor = UnstructuredRunner(strategy="hi_res")
         self.tabular = TabularExtractor()
-        self.vision = GeminiVision()
+        self.http = create_http_client()
+        self.vision = GeminiVision(http_client=self.http)
         self.chunker = ParentChildChunker()
-        self.embedder = EmbeddingGenerator()
-        self.feeder = VespaFeeder()
+        self.embedder = EmbeddingGenerator(cache=get_embedding_cache())
+        self.feeder = VespaFeeder(http_client=self.http)
         
-        self.storage_client = storage.Client()
+        # Created on first use (see aio_storage)
+        self._aio_storage = None
         self.user_bucket = os.getenv("USER_UPLOADS_BUCKET")
         self.crops_bucket = os.getenv("PAGE_CROPS_BUCKET")
     
+    @property
+    def aio_storage(self) -> Storage:
+        """
+        GCS client, created on first use.
+        
+        Its aiohttp session binds to the running event loop, so it can't be
+        built in __init__, which may run in a thread (startup warm-up).
+        """
+        if self._aio_storage is None:
+            self._aio_storage = Storage()
+        return self._aio_storage
+    
+    async def aclose(self):
+        """Close pooled HTTP connections and the GCS session."""
+        await self.http.aclose()
+        if self._aio_storage is not None:
+            await self._aio_storage.close()
+    
     async def ingest(self, doc_id: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Run ingestion for user document (any supported type)."""
         stats = {
@@ -44,6 +72,7 @@ class UserIngestionPipeline:
             "chunks_indexed": 0
         }
         
+        local_path = None
         try:
             local_path = await self._download_file(metadata["gcs_uri"])
             file_type = FileRouter.detect_type(local_path)
@@ -56,12 +85,15 @@ class UserIngestionPipeline:
             else:
                 raise ValueError(f"Unsupported file type: {file_type}")
             
-            os.remove(local_path)
-            
         except Exception as e:
             stats["status"] = "failed"
             stats["error"] = str(e)
         
+        finally:
+            # On failure too: scratch may be RAM-backed tmpfs
+            if local_path is not None:
+                remove_later(local_path)
+        
         return stats
     
     async def _ingest_tabular(
@@ -72,26 +104,44 @@ class UserIngestionPipeline:
         stats: Dict
     ) -> Dict:
         """Ingest CSV/Excel file - fast path, no vision needed."""
-        chunks = self.tabular.extract(file_path, doc_id)
-        stats["chunks_extracted"] = len(chunks)
-        
-        # Convert to Vespa docs
-        vespa_docs = self.tabular.to_vespa_docs(
-            chunks, doc_id,
-            access_scope="private",
-            owner_user_id=metadata["owner_user_id"]
-        )
-        
-        # Generate embeddings
-        texts = [d["content_text"] for d in vespa_docs]
-        embeddings, _ = self.embedder.batch_embed(texts, include_colbert=False)
-        
-        for i, doc in enumerate(vespa_docs):
-            doc["embedding"] = embeddings[i]
+        stats["chunks_extracted"] = 0
+        stats["chunks_embedded"] = 0
+        
+        # Embed and feed one group at a time so huge sheets stay out of RAM
+        chunk_stream = self.tabular.extract(file_path, doc_id)
+        while True:
+            chunks = list(islice(chunk_stream, self.TABULAR_FEED_BATCH))
+            if not chunks:
+                break
+            stats["chunks_extracted"] += len(chunks)
+            
+            # Convert to Vespa docs
+            vespa_docs = self.tabular.to_vespa_docs(
+                chunks, doc_id,
+                access_scope="private",
+                owner_user_id=metadata["owner_user_id"]
+            )
+            
+            # Generate embeddings only for chunks with natural-language
+            # cells; numeric-only chunks are left to BM25 (no embedding)
+            text_docs = [
+                doc for chunk, doc in zip(chunks, vespa_docs) if chunk.text_like
+            ]
+            if text_docs:
+                texts = [d["content_text"] for d in text_docs]
+                # Sync client plus cache I/O; keep the event loop free
+                embeddings, _ = await asyncio.to_thread(
+                    self.embedder.batch_embed, texts, include_colbert=False
+                )
+                
+                for doc, embedding in zip(text_docs, embeddings):
+                    doc["embedding"] = embedding
+            stats["chunks_embedded"] += len(text_docs)
+            
+            # Feed to Vespa
+            feed_stats = await self.feeder.feed_docs(vespa_docs)
+            stats["chunks_indexed"] += feed_stats["success"]
         
-        # Feed to Vespa
-        feed_stats = await self.feeder.feed_docs(vespa_docs)
-        stats["chunks_indexed"] = feed_stats["success"]
         stats["status"] = "completed"
         
         return stats
@@ -104,20 +154,20 @@ class UserIngestionPipeline:
         stats: Dict
     ) -> Dict:
         """Ingest PDF file with vision processing."""
-        elements, page_types = self.extractor.extract(file_path)
+        elements, page_types = await self.extractor.extract_async(file_path)
         stats["elements_extracted"] = len(elements)
         
-        processed = []
-        for elem in elements:
-            p = await self._process_element(elem, doc_id, file_path)
-            processed.append(p)
+        # Vision calls for all elements are issued together; GeminiVision
+        # bounds how many are in flight
+        processed = await asyncio.gather(
+            *(self._process_element(elem, doc_id, file_path) for elem in elements)
+        )
         
         chunks = self.chunker.chunk_elements(processed, doc_id)
-        texts = [c.content_text for c in chunks]
-        embeddings, _ = self.embedder.batch_embed(texts, include_colbert=False)
-        
-        for i, chunk in enumerate(chunks):
-            chunk.metadata["embedding"] = embeddings[i]
+        # Sync client plus cache I/O; keep the event loop free
+        chunks.embeddings, _ = await asyncio.to_thread(
+            self.embedder.batch_embed, chunks.texts, include_colbert=False
+        )
         
         feed_stats = await self.feeder.feed_chunks(
             chunks, access_scope="private", owner_user_id=metadata["owner_user_id"]
@@ -128,17 +178,11 @@ class UserIngestionPipeline:
         return stats
     
     async def _download_file(self, gcs_uri: str) -> str:
-        """Download file from GCS preserving extension."""
-        bucket_name = gcs_uri.split("/")[2]
-        blob_path = "/".join(gcs_uri.split("/")[3:])
+        """Stream file from GCS to local temp file, preserving extension."""
+        _, blob_path = parse_gcs_uri(gcs_uri)
         ext = os.path.splitext(blob_path)[1]
-        
-        bucket = self.storage_client.bucket(bucket_name)
-        blob = bucket.blob(blob_path)
-        
-        with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as f:
-            blob.download_to_filename(f.name)
-            return f.name
+        path, _ = await download_to_tempfile(self.aio_storage, gcs_uri, suffix=ext)
+        return path
     
     async def _process_element(self, elem, doc_id: str, pdf_path: str) -> dict:
         """Process PDF element with optional vision."""
@@ -153,7 +197,9 @@ class UserIngestionPipeline:
         
         if elem.element_type == "table" and elem.bbox != [0, 0, 0, 0]:
             try:
-                crop = self.vision.crop_region(pdf_path, elem.page_number - 1, elem.bbox)
+                crop = await run_mupdf(
+                    self.vision.crop_region, pdf_path, elem.local_page, elem.bbox
+                )
                 vr = await self.vision.process_table(crop, elem.element_id)
                 result["metadata"]["html"] = vr.content
             except Exception as e:
@@ -162,7 +208,9 @@ class UserIngestionPipeline:
         
         elif elem.element_type == "figure" and elem.bbox != [0, 0, 0, 0]:
             try:
-                crop = self.vision.crop_region(pdf_path, elem.page_number - 1, elem.bbox)
+                crop = await run_mupdf(
+                    self.vision.crop_region, pdf_path, elem.local_page, elem.bbox
+                )
                 vr = await self.vision.process_figure(crop, elem.element_id)
                 result["metadata"]["figure_caption"] = vr.content
             except Exception as e:
@@ -4,15 +4,15 @@ Retry and QoS Module
 Handles retries, partial failures, and quality of service for ingestion.
 """
 import asyncio
-from typing import Callable, Any, List, Dict
+import random
+import time
+from collections import deque
+from typing import Callable, Any, List, Dict, Optional
 from functools import wraps
 from dataclasses import dataclass
-from tenacity import (
-    retry,
-    stop_after_attempt,
-    wait_exponential,
-    retry_if_exception_type
-)
+
+# Cap on stored error text; downstream errors can embed whole responses
+MAX_ERR_LEN = 512
 
 class IngestionError(Exception):
     """Base exception for ingestion errors."""
@@ -26,31 +26,83 @@ class PermanentError(IngestionError):
     """Error that should not be retried."""
     pass
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class BatchResult:
     batch_id: int
     success: bool
     elements_processed: int
-    error: str = None
+    error: Optional[str] = None
+    error_type: Optional[str] = None
 
 def with_retry(
     max_attempts: int = 3,
     min_wait: float = 1,
     max_wait: float = 30
 ):
-    """Decorator for retryable operations."""
+    """
+    Decorator for retryable operations.
+    
+    Retries on RetryableError with exponential backoff (min_wait doubling
+    per attempt, capped at max_wait) and jitter of 0.5-1.5x so concurrent
+    callers don't retry in lockstep. Other exceptions propagate at once.
+    """
+    # Backoff before each retry, fixed at decoration time
+    delays = tuple(min(max_wait, min_wait * (2 ** i)) for i in range(max_attempts - 1))
+    
     def decorator(func: Callable) -> Callable:
         @wraps(func)
-        @retry(
-            stop=stop_after_attempt(max_attempts),
-            wait=wait_exponential(multiplier=1, min=min_wait, max=max_wait),
-            retry=retry_if_exception_type(RetryableError)
-        )
         async def wrapper(*args, **kwargs):
+            for delay in delays:
+                try:
+                    return await func(*args, **kwargs)
+                except RetryableError:
+                    await asyncio.sleep(delay * (0.5 + random.random()))
+            # Last attempt: errors propagate
             return await func(*args, **kwargs)
         return wrapper
     return decorator
 
+async def _process_one(batch: Any, processor: Callable) -> BatchResult:
+    """Run processor on one batch, capturing any error in the result."""
+    try:
+        result = await processor(batch)
+        return BatchResult(
+            batch_id=batch.batch_id,
+            success=True,
+            elements_processed=result.get("elements", 0)
+        )
+    except Exception as e:
+        return BatchResult(
+            batch_id=batch.batch_id,
+            success=False,
+            elements_processed=0,
+            error=repr(e)[:MAX_ERR_LEN],
+            error_type=type(e).__name__
+        )
+
+@dataclass(slots=True)
+class _PoolState:
+    """State shared by the workers of one BatchProcessor pool."""
+    queue: asyncio.Queue
+    results: List[Optional[BatchResult]]
+    processor: Callable
+    fail_limit: float  # more failures than this fail the whole run
+    failures: int = 0
+    aborted: bool = False
+
+async def _worker(pool: _PoolState):
+    """Process (index, batch) items until a None sentinel or an abort."""
+    while not pool.aborted and (item := await pool.queue.get()) is not None:
+        index, batch = item
+        result = await _process_one(batch, pool.processor)
+        pool.results[index] = result
+        if not result.success:
+            pool.failures += 1
+            # Failures only accumulate, so the run is already lost: stop
+            # taking batches (those in flight elsewhere still finish)
+            if pool.failures > pool.fail_limit:
+                pool.aborted = True
+
 class BatchProcessor:
     """Processes batches with partial failure handling."""
     
@@ -79,39 +131,35 @@ class BatchProcessor:
         Returns:
             Results dict with success/failure stats
         """
-        semaphore = asyncio.Semaphore(self.max_concurrent)
-        results: List[BatchResult] = []
+        if len(batches) <= self.max_concurrent:
+            # Nothing to throttle: run every batch at once
+            results = await asyncio.gather(*[_process_one(b, processor) for b in batches])
+        else:
+            results = await self._run_pool(batches, processor)
         
-        async def process_with_semaphore(batch):
-            async with semaphore:
-                try:
-                    result = await processor(batch)
-                    return BatchResult(
-                        batch_id=batch.batch_id,
-                        success=True,
-                        elements_processed=result.get("elements", 0)
-                    )
-                except Exception as e:
-                    return BatchResult(
-                        batch_id=batch.batch_id,
-                        success=False,
-                        elements_processed=0,
-                        error=str(e)
-                    )
-        
-        # Process all batches
-        tasks = [process_with_semaphore(b) for b in batches]
-        results = await asyncio.gather(*tasks)
-        
-        # Calculate stats
-        successful = [r for r in results if r.success]
-        failed = [r for r in results if not r.success]
-        
-        failure_rate = len(failed) / len(results) if results else 0
+        # Calculate stats in one pass
+        successful = 0
+        total_elements = 0
+        errors = []
+        for r in results:
+            if r is None:
+                continue  # never run: the pool aborted early
+            if r.success:
+                successful += 1
+                total_elements += r.elements_processed
+            else:
+                errors.append({
+                    "batch_id": r.batch_id,
+                    "error": r.error,
+                    "error_type": r.error_type
+                })
+        
+        # Over all submitted batches, so an aborted run still exceeds it
+        failure_rate = len(errors) / len(results) if results else 0
         
         # Check if failure threshold exceeded
-        if not self.allow_partial_failure and failed:
-            raise IngestionError(f"Batch failures: {[r.error for r in failed]}")
+        if not self.allow_partial_failure and errors:
+            raise IngestionError(f"Batch failures: {[e['error'] for e in errors]}")
         
         if failure_rate > self.failure_threshold:
             raise IngestionError(
@@ -120,29 +168,190 @@ class BatchProcessor:
         
         return {
             "total_batches": len(results),
-            "successful_batches": len(successful),
-            "failed_batches": len(failed),
-            "total_elements": sum(r.elements_processed for r in successful),
-            "errors": [{"batch_id": r.batch_id, "error": r.error} for r in failed]
+            "successful_batches": successful,
+            "failed_batches": len(errors),
+            "total_elements": total_elements,
+            "errors": errors
         }
+    
+    async def _run_pool(
+        self,
+        batches: List[Any],
+        processor: Callable
+    ) -> List[Optional[BatchResult]]:
+        """
+        Run batches through max_concurrent workers, keeping input order.
+        
+        Stops handing out batches once failures exceed what the threshold
+        allows; the stats pass then raises on the failures collected.
+        """
+        # Fixed pool of workers pulling from a queue: tasks scale with
+        # max_concurrent rather than with the number of batches
+        n_workers = self.max_concurrent
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(batches):
+            queue.put_nowait(item)
+        for _ in range(n_workers):
+            queue.put_nowait(None)
+        
+        # Filled by index so results keep the input batch order; batches
+        # skipped after an abort stay None
+        pool = _PoolState(
+            queue=queue,
+            results=[None] * len(batches),
+            processor=processor,
+            fail_limit=(
+                self.failure_threshold * len(batches)
+                if self.allow_partial_failure else 0
+            )
+        )
+        
+        # _process_one catches processor errors; anything else cancels the
+        # rest of the group and surfaces here
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(n_workers):
+                tg.create_task(_worker(pool))
+        return pool.results
 
 class RateLimiter:
-    """Rate limiter for API calls."""
+    """
+    Token-bucket rate limiter for API calls.
     
-    def __init__(self, calls_per_minute: int = 60):
-        self.calls_per_minute = calls_per_minute
-        self.interval = 60.0 / calls_per_minute
-        self.last_call = 0
-        self._lock = asyncio.Lock()
+    The bucket holds up to burst tokens and refills at calls_per_minute.
+    Calls after an idle period go through immediately; sustained load
+    converges to the configured rate.
+    """
     
-    async def acquire(self):
-        """Wait until rate limit allows next call."""
-        async with self._lock:
-            now = asyncio.get_event_loop().time()
-            wait_time = self.last_call + self.interval - now
-            if wait_time > 0:
+    def __init__(self, calls_per_minute: int = 60, burst: int = None):
+        if calls_per_minute <= 0:
+            raise ValueError(f"calls_per_minute must be positive, got {calls_per_minute}")
+        # Default burst: ten seconds' worth of calls
+        self.capacity = burst or max(1, calls_per_minute // 6)
+        # Tokens are kept as nanoseconds of refill time, so the bucket
+        # arithmetic is all integer: one token = interval_ns
+        self.interval_ns = int(60 * 1e9 / calls_per_minute)
+        self._capacity_ns = self.capacity * self.interval_ns
+        # (tokens_ns, last_refill_ns), replaced as a whole on each update
+        self._state = (self._capacity_ns, 0)
+        # Held only by callers that have to wait for tokens
+        self._waiters = asyncio.Lock()
+    
+    def _try_take(self, cost: float) -> float:
+        """
+        Take cost tokens if available.
+        
+        Returns 0 on success, else the seconds until enough tokens refill.
+        Nothing here awaits, so the read-modify-write of _state is atomic
+        with respect to other coroutines on the loop.
+        """
+        tokens_ns, last_refill_ns = self._state
+        now_ns = time.monotonic_ns()
+        tokens_ns = min(self._capacity_ns, tokens_ns + now_ns - last_refill_ns)
+        cost_ns = int(cost * self.interval_ns)
+        if tokens_ns >= cost_ns:
+            self._state = (tokens_ns - cost_ns, now_ns)
+            return 0.0
+        self._state = (tokens_ns, now_ns)
+        return (cost_ns - tokens_ns) / 1e9
+    
+    async def acquire(self, cost: float = 1):
+        """
+        Wait until cost tokens are available, then take them.
+        
+        Raises:
+            ValueError: If cost is not positive or exceeds the bucket
+                capacity (such a request could never be served)
+        """
+        if not 0 < cost <= self.capacity:
+            raise ValueError(
+                f"cost must be in (0, {self.capacity}], got {cost}"
+            )
+        
+        # Fast path: lock-free, unless others are already queued for tokens
+        if not self._waiters.locked() and self._try_take(cost) == 0:
+            return
+        
+        # Slow path: wait in line so waiters are served in arrival order
+        async with self._waiters:
+            while (wait_time := self._try_take(cost)) > 0:
                 await asyncio.sleep(wait_time)
-            self.last_call = asyncio.get_event_loop().time()
+
+class LeakyBucketLimiter:
+    """
+    Leaky-bucket rate limiter (counter only, no queue).
+    
+    Each call adds one unit to the bucket, which drains at
+    sustained_per_sec. Up to burst calls go through at once; beyond that
+    callers are delayed until their unit fits, so load after a burst is
+    evenly spaced rather than arriving in refill-sized clumps.
+    """
+    
+    def __init__(self, burst: int = 1, sustained_per_sec: float = 1.0):
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+        if sustained_per_sec <= 0:
+            raise ValueError(f"sustained_per_sec must be positive, got {sustained_per_sec}")
+        self.capacity = burst
+        # Level is tracked in nanoseconds of drain time; one unit = unit_ns
+        self.unit_ns = int(1e9 / sustained_per_sec)
+        self._capacity_ns = self.capacity * self.unit_ns
+        self.level_ns = 0
+        self.last_ns = 0
+    
+    async def acquire(self):
+        """Reserve a slot in the bucket, waiting if it overflows."""
+        now_ns = time.monotonic_ns()
+        level_ns = max(0, self.level_ns - (now_ns - self.last_ns)) + self.unit_ns
+        # Reserve before sleeping so concurrent callers queue up behind us
+        self.level_ns = level_ns
+        self.last_ns = now_ns
+        
+        overflow_ns = level_ns - self._capacity_ns
+        if overflow_ns > 0:
+            await asyncio.sleep(overflow_ns / 1e9)
+
+class SlidingWindowLimiter:
+    """
+    Strict rolling-window limiter: at most limit calls in any window.
+    
+    For providers that enforce an exact requests-per-minute quota, which a
+    token bucket can overshoot after idle periods. Keeps one timestamp per
+    call in the window (deque, so pruning old calls is O(1) each).
+    """
+    
+    def __init__(self, limit: int, window: float = 60.0):
+        if limit < 1:
+            raise ValueError(f"limit must be at least 1, got {limit}")
+        self.limit = limit
+        self.window = window
+        self.window_ns = int(window * 1e9)
+        self.timestamps: deque = deque()  # monotonic_ns of each call
+    
+    def _try_record(self) -> float:
+        """
+        Record a call if it fits in the window.
+        
+        Returns 0 on success, else the seconds until the oldest call leaves
+        the window. Nothing here awaits, so the check and the append are
+        atomic with respect to other coroutines on the loop.
+        """
+        timestamps = self.timestamps
+        now_ns = time.monotonic_ns()
+        cutoff_ns = now_ns - self.window_ns
+        while timestamps and timestamps[0] <= cutoff_ns:
+            timestamps.popleft()
+        if len(timestamps) < self.limit:
+            timestamps.append(now_ns)
+            return 0.0
+        return (timestamps[0] - cutoff_ns) / 1e9
+    
+    async def acquire(self):
+        """Wait until the call fits in the window, then record it."""
+        # Sleep without holding anything, so waiters don't block each
+        # other, and re-check on waking: another caller may have taken
+        # the freed slot
+        while (wait_time := self._try_record()) > 0:
+            await asyncio.sleep(wait_time)
 
 class CircuitBreaker:
     """Circuit breaker for external service calls."""
@@ -154,27 +363,58 @@ class CircuitBreaker:
     ):
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
+        self._recovery_timeout_ns = int(recovery_timeout * 1e9)
         self.failures = 0
-        self.last_failure_time = 0
+        self.last_failure_ns = 0  # monotonic_ns of the latest failure
         self.state = "closed"  # closed, open, half-open
+        self._open = False  # state != "closed"; the only check on the hot path
+        self._reopen_deadline_ns = 0  # when an open breaker goes half-open
+        self._probe_in_flight = False  # half-open admits one trial call at a time
     
     async def call(self, func: Callable, *args, **kwargs):
         """Execute function with circuit breaker protection."""
+        if not self._open:
+            # Closed: just count failures
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                self._record_failure()
+                raise
+        return await self._call_open(func, args, kwargs)
+    
+    async def _call_open(self, func: Callable, args: tuple, kwargs: dict):
+        """Open/half-open: fail fast, or let a single trial call through."""
         if self.state == "open":
-            if asyncio.get_event_loop().time() - self.last_failure_time > self.recovery_timeout:
+            if time.monotonic_ns() >= self._reopen_deadline_ns:
                 self.state = "half-open"
             else:
                 raise IngestionError("Circuit breaker is open")
         
+        # No await between the check and the set, so only one caller wins
+        if self._probe_in_flight:
+            raise IngestionError("Circuit breaker half-open, probe in progress")
+        self._probe_in_flight = True
+        
         try:
             result = await func(*args, **kwargs)
-            if self.state == "half-open":
-                self.state = "closed"
-                self.failures = 0
-            return result
-        except Exception as e:
-            self.failures += 1
-            self.last_failure_time = asyncio.get_event_loop().time()
-            if self.failures >= self.failure_threshold:
-                self.state = "open"
+        except Exception:
+            # failures is still at the threshold, so this reopens the
+            # breaker with a fresh deadline
+            self._record_failure()
             raise
+        finally:
+            self._probe_in_flight = False
+        
+        self.state = "closed"
+        self._open = False
+        self.failures = 0
+        return result
+    
+    def _record_failure(self):
+        failures = self.failures + 1
+        self.failures = failures
+        self.last_failure_ns = time.monotonic_ns()
+        if failures >= self.failure_threshold:
+            self.state = "open"
+            self._open = True
+            self._reopen_deadline_ns = self.last_failure_ns + self._recovery_timeout_ns
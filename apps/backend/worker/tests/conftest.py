@@ -0,0 +1,13 @@
+"""
+Test setup: make the worker (src.*) and shared packages importable the way
+they are laid out in the container (/app/src, /app/shared).
+"""
+import os
+import sys
+
+WORKER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.dirname(WORKER_DIR)
+
+for path in (WORKER_DIR, BACKEND_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,71 @@
+"""Tests for streaming GCS downloads to scratch files."""
+import asyncio
+import hashlib
+
+import pytest
+
+from src.ingest import gcs_io
+
+
+class FakeResponse:
+    def __init__(self):
+        self.released = False
+    
+    def release(self):
+        self.released = True
+
+
+class FakeStream:
+    """Stands in for gcloud.aio's StreamResponse."""
+    
+    def __init__(self, chunks, fail_after=None):
+        self._response = FakeResponse()
+        self._chunks = list(chunks)
+        self._fail_after = fail_after
+        self._reads = 0
+        self.content_length = sum(len(c) for c in chunks)
+    
+    async def read(self, size=-1):
+        if self._fail_after is not None and self._reads >= self._fail_after:
+            raise ConnectionResetError("connection lost mid-download")
+        self._reads += 1
+        return self._chunks.pop(0) if self._chunks else b""
+
+
+class FakeStorage:
+    def __init__(self, stream):
+        self.stream = stream
+    
+    async def download_stream(self, bucket, blob_path):
+        return self.stream
+
+
+@pytest.fixture
+def scratch(tmp_path, monkeypatch):
+    monkeypatch.setattr(gcs_io, "get_scratch_dir", lambda size_bytes=0: str(tmp_path))
+    return tmp_path
+
+
+def test_download_writes_file_and_releases_stream(scratch):
+    stream = FakeStream([b"%PDF-", b"1.7"])
+    
+    path, sha = asyncio.run(gcs_io.download_to_tempfile(
+        FakeStorage(stream), "gs://bucket/docs/a.pdf", suffix=".pdf"
+    ))
+    
+    with open(path, "rb") as f:
+        assert f.read() == b"%PDF-1.7"
+    assert sha == hashlib.sha256(b"%PDF-1.7").hexdigest()
+    assert stream._response.released
+
+
+def test_failed_download_removes_partial_file_and_releases_stream(scratch):
+    stream = FakeStream([b"%PDF-", b"1.7"], fail_after=1)
+    
+    with pytest.raises(ConnectionResetError):
+        asyncio.run(gcs_io.download_to_tempfile(
+            FakeStorage(stream), "gs://bucket/docs/a.pdf", suffix=".pdf"
+        ))
+    
+    assert list(scratch.iterdir()) == []
+    assert stream._response.released
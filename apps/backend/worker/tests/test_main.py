@@ -0,0 +1,66 @@
+"""Tests for worker app startup and shutdown wiring."""
+import asyncio
+import sys
+import types
+
+import pytest
+
+from src import main
+
+
+class FakePipeline:
+    """Cheap stand-in for a pipeline: counts builds, records closing."""
+    
+    built = 0
+    
+    def __init__(self):
+        type(self).built += 1
+        self.closed = False
+    
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeAdminPipeline(FakePipeline):
+    built = 0
+
+
+class FakeUserPipeline(FakePipeline):
+    built = 0
+
+
+@pytest.fixture
+def fake_pipelines(monkeypatch):
+    """Serve fake pipeline classes to main's lazy imports; start unbuilt."""
+    for module_name, attr, cls in (
+        ("src.pipelines.admin_ingest", "AdminIngestionPipeline", FakeAdminPipeline),
+        ("src.pipelines.user_ingest", "UserIngestionPipeline", FakeUserPipeline),
+    ):
+        module = types.ModuleType(module_name)
+        setattr(module, attr, cls)
+        monkeypatch.setitem(sys.modules, module_name, module)
+        monkeypatch.setattr(cls, "built", 0)
+    monkeypatch.setattr(main, "admin_pipeline", None)
+    monkeypatch.setattr(main, "user_pipeline", None)
+    monkeypatch.setattr(main, "job_queue", None)
+
+
+def test_warm_pipelines_builds_each_pipeline_once(fake_pipelines):
+    asyncio.run(main.warm_pipelines())
+    
+    assert isinstance(main.admin_pipeline, FakeAdminPipeline)
+    assert isinstance(main.user_pipeline, FakeUserPipeline)
+    # Requests reuse the warmed instances
+    assert main.get_admin_pipeline() is main.admin_pipeline
+    assert main.get_user_pipeline() is main.user_pipeline
+    assert FakeAdminPipeline.built == 1
+    assert FakeUserPipeline.built == 1
+
+
+def test_close_pipelines_closes_built_pipelines(fake_pipelines):
+    asyncio.run(main.warm_pipelines())
+    
+    asyncio.run(main.close_pipelines())
+    
+    assert main.admin_pipeline.closed
+    assert main.user_pipeline.closed
@@ -0,0 +1,59 @@
+"""Tests for retry and QoS helpers."""
+import asyncio
+
+import pytest
+
+from src.retries_qos import LeakyBucketLimiter, RateLimiter, SlidingWindowLimiter
+
+
+@pytest.mark.parametrize("cost", [0, -1, 6])
+def test_rate_limiter_rejects_unservable_cost(cost):
+    limiter = RateLimiter(calls_per_minute=60, burst=5)
+    
+    with pytest.raises(ValueError):
+        asyncio.run(limiter.acquire(cost))
+
+
+def test_rate_limiter_serves_full_burst_at_once():
+    limiter = RateLimiter(calls_per_minute=60, burst=5)
+    
+    asyncio.run(asyncio.wait_for(limiter.acquire(5), timeout=1))
+
+
+@pytest.mark.parametrize("calls_per_minute", [0, -60])
+def test_rate_limiter_rejects_non_positive_rate(calls_per_minute):
+    with pytest.raises(ValueError):
+        RateLimiter(calls_per_minute=calls_per_minute)
+
+
+@pytest.mark.parametrize("burst, sustained_per_sec", [(0, 1.0), (1, 0), (1, -2.0)])
+def test_leaky_bucket_rejects_invalid_config(burst, sustained_per_sec):
+    with pytest.raises(ValueError):
+        LeakyBucketLimiter(burst=burst, sustained_per_sec=sustained_per_sec)
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_sliding_window_rejects_non_positive_limit(limit):
+    with pytest.raises(ValueError):
+        SlidingWindowLimiter(limit=limit)
+
+
+def test_sliding_window_admits_limit_calls_per_window():
+    limiter = SlidingWindowLimiter(limit=2, window=0.2)
+    
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        admitted = []
+        
+        async def call():
+            await limiter.acquire()
+            admitted.append(loop.time() - start)
+        
+        await asyncio.gather(*(call() for _ in range(4)))
+        return sorted(admitted)
+    
+    admitted = asyncio.run(run())
+    
+    assert admitted[1] < 0.1
+    assert admitted[2] >= 0.19 and admitted[3] >= 0.19
@@ -0,0 +1,78 @@
+"""Tests for tabular chunk content."""
+import openpyxl
+import pandas as pd
+
+from src.ingest.tabular_extractor import TabularExtractor
+
+
+def test_mixed_int_float_rows_keep_int_formatting():
+    df = pd.DataFrame({"id": [1, 2], "price": [1.5, 2.0], "name": ["bolt", "nut"]})
+    
+    chunks = list(TabularExtractor()._chunk_dataframe(df, "doc-1", "sheet1"))
+    
+    assert len(chunks) == 1
+    assert chunks[0].content_text == (
+        "Columns: id | price | name\n"
+        "\n"
+        "id: 1 | price: 1.5 | name: bolt\n"
+        "id: 2 | price: 2.0 | name: nut"
+    )
+
+
+def test_csv_rows_keep_int_formatting(tmp_path):
+    csv_path = tmp_path / "parts.csv"
+    csv_path.write_text("id,price\n1,1.5\n2,2.25\n")
+    
+    chunks = TabularExtractor().extract_list(str(csv_path), "doc-1")
+    
+    assert chunks[0].content_text.splitlines()[2:] == [
+        "id: 1 | price: 1.5",
+        "id: 2 | price: 2.25",
+    ]
+
+
+def write_xlsx(path, rows, styled_blank_rows=0):
+    """Write rows to a one-sheet workbook, optionally stretching its dimensions."""
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    # Formatting empty cells extends the sheet's dimensions past the data
+    for i in range(styled_blank_rows):
+        sheet.cell(row=len(rows) + 1 + i, column=1).number_format = "0.00"
+    workbook.save(path)
+
+
+def test_xlsx_skips_blank_rows_past_the_data(tmp_path):
+    xlsx_path = tmp_path / "parts.xlsx"
+    write_xlsx(xlsx_path, [["id", "name"], [1, "bolt"], [], [2, "nut"]], styled_blank_rows=10)
+    
+    chunks = TabularExtractor().extract_list(str(xlsx_path), "doc-1")
+    
+    assert len(chunks) == 1
+    assert chunks[0].row_end == 2
+    assert chunks[0].content_text.splitlines()[2:] == [
+        "id: 1 | name: bolt",
+        "id: 2 | name: nut",
+    ]
+
+
+def test_xlsx_headers_are_named_like_pandas(tmp_path):
+    xlsx_path = tmp_path / "parts.xlsx"
+    write_xlsx(xlsx_path, [["id", None, "name", "name"], [1, "x", "bolt", "steel"]])
+    
+    chunks = TabularExtractor().extract_list(str(xlsx_path), "doc-1")
+    
+    assert chunks[0].columns == ["id", "Unnamed: 1", "name", "name.1"]
+
+
+def test_xlsx_rows_are_fitted_to_header_width(tmp_path):
+    xlsx_path = tmp_path / "parts.xlsx"
+    write_xlsx(xlsx_path, [["id", "name", "grade"], [1, "bolt"], [2, "nut", "A", "extra"]])
+    
+    chunks = TabularExtractor().extract_list(str(xlsx_path), "doc-1")
+    
+    assert chunks[0].content_text.splitlines()[2:] == [
+        "id: 1 | name: bolt | grade: None",
+        "id: 2 | name: nut | grade: A",
+    ]